@@ -104,10 +104,14 @@ class App(object):
                     book.add_item(audio_item)
 
                     # s2. Add SMIL
+                    # streamed to a file next to the chapter audio, and copied into the EPUB when it's saved,
+                    # so the SMIL contents of all chapters are not held in memory until then
                     smil_href = str(chapter.href) + ".smil"
-                    smil_text = helpers.generate_smil_content(smil_href, chapter.href, aud_href, task_result.alignments)
+                    smil_file = task_result.audio_file.with_suffix(".smil")
+                    with smil_file.open("w", encoding="utf-8") as f:
+                        helpers.generate_smil_content(smil_href, chapter.href, aud_href, task_result.alignments, out=f)
                     smil_id = f"sm_{idx}"
-                    smil_item = EpubSMIL(raw_content = smil_text.encode(),
+                    smil_item = EpubSMIL(raw_content = LazyLoadFromFile(smil_file),
                                          id = smil_id,
                                          href = smil_href,
                                          media_type = "application/smil+xml",
@@ -31,6 +31,9 @@ class UserSettings:
         self.tts_voice: str = "en-US-AvaMultilingualNeural"
         self.tts_chunk_len: int = -1  # Max chars length per chunk for a TTS request.
         self.tts_speed: float = 1.0
+        self.tts_concurrency: int = 1  # Max concurrent TTS requests (azure) or chunk inferences (kokoro) per chapter
+        self.tts_cache: bool = False  # Reuse synthesized audio of unchanged chunks across runs
+        self.tts_dtype: str = "float32"  # Inference precision of local models (kokoro): float32, bfloat16 or float16
 
         # Force alignment similarity threshold
         self.align_threshold: float = 95.0
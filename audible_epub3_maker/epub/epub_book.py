@@ -1,5 +1,6 @@
 import shutil
 import zipfile
+import time
 import logging
 import uuid
 import re
@@ -569,9 +570,16 @@ class EpubBook:
             with zipfile.ZipFile(self.epub_path, "r") as zp_original:
                 for item in lazyload_from_orig_epub:
                     zip_relpath = self.to_zip_relpath(item.href)
-                    data = zp_original.read(zip_relpath)
-                    zp.writestr(zip_relpath, data)
-                    logger.debug(f"save lazyload content from EPUB: {len(data)/1024:.2f} KB, {zip_relpath}")
+                    # stream the entry, instead of reading it into memory first (audio/images may be large)
+                    src_info = zp_original.getinfo(zip_relpath)
+                    dst_info = zipfile.ZipInfo(zip_relpath, date_time=time.localtime(time.time())[:6])
+                    dst_info.compress_type = zp.compression
+                    dst_info._compresslevel = zp.compresslevel  # same as zp.writestr() (`compress_level` since Python 3.13)
+                    dst_info.external_attr = 0o600 << 16  # same as zp.writestr()
+                    dst_info.file_size = src_info.file_size  # lets zipfile decide whether zip64 is needed
+                    with zp_original.open(src_info) as src, zp.open(dst_info, "w") as dst:
+                        shutil.copyfileobj(src, dst)
+                    logger.debug(f"save lazyload content from EPUB: {src_info.file_size/1024:.2f} KB, {zip_relpath}")
         
         for item in layzload_from_other_zip:
             other_zip_file = item.get_lazy_load().zip_file_path
@@ -1,12 +1,16 @@
 import re
 import logging
 from bs4 import BeautifulSoup, Tag, NavigableString
+from lxml import etree as ET
 
-from audible_epub3_maker.utils.constants import BEAUTIFULSOUP_PARSER, SEG_ID_PREFIX, SEG_MARK_ATTR
+from audible_epub3_maker.utils.constants import BEAUTIFULSOUP_PARSER, SEG_ID_PREFIX, SEG_MARK_ATTR, SEG_TAG
 from audible_epub3_maker.segmenter.text_segmenter import segment_text_by_re, is_readable
+from audible_epub3_maker.epub.utils import parse_xml
 
 logger = logging.getLogger(__name__)
 
+_ASCII_SPACES = " \t\n\r\f"  # same as BeautifulSoup.ASCII_SPACES
+
 def get_hierarchy_name(tag: Tag) -> str:
     """Returns a string representation of the tag's hierarchy."""
     hierarchy = []
@@ -41,9 +45,11 @@ def _bs_segment_node(soup: BeautifulSoup, node: Tag, wrapping_tag: str = "span",
         - Other types of children are preserved.
     The node's contents are replaced with the newly processed children.
     """
-    
-    logger.debug(f"Processing Node: {get_hierarchy_name(node)}")
-    logger.debug(f"  {get_hierarchy_name(node)}'s original contents [{len(node.contents)}]: {node.contents}")
+    # the debug messages below repr whole node contents, so they are only built when DEBUG is enabled
+    debug_enabled = logger.isEnabledFor(logging.DEBUG)
+    if debug_enabled:
+        logger.debug(f"Processing Node: {get_hierarchy_name(node)}")
+        logger.debug(f"  {get_hierarchy_name(node)}'s original contents [{len(node.contents)}]: {node.contents}")
     new_contents = []
 
     for child in node.contents:
@@ -65,14 +71,16 @@ def _bs_segment_node(soup: BeautifulSoup, node: Tag, wrapping_tag: str = "span",
                 logger.debug("  Keep empty NavigableString child")
                 new_contents.append(child)  # 保留空白的 NavigableString
         elif isinstance(child, Tag):
-            logger.debug(f"  Handle Tag: {get_hierarchy_name(child)}")
+            if debug_enabled:
+                logger.debug(f"  Handle Tag: {get_hierarchy_name(child)}")
             _bs_segment_node(soup, child, wrapping_tag, wrapping_tag_attrs)
             new_contents.append(child)  # don't forget processed child
         else:
             logger.debug(f"  Keep unknown type child: {type(child)}")
             new_contents.append(child)
     
-    logger.debug(f"  {get_hierarchy_name(node)}'s new contents [{len(new_contents)}]: {new_contents}")
+    if debug_enabled:
+        logger.debug(f"  {get_hierarchy_name(node)}'s new contents [{len(new_contents)}]: {new_contents}")
     
     # TODO: 定义一个 contents_smooth 函数，将新 contents 中超短的 <span> 或者 NavigableString 并入前后 span
 
@@ -92,17 +100,24 @@ def _bs_append_suffix_inside(tag: Tag, suffix: str):
     tag.append(suffix)
 
 def bs_append_suffix_to_tags(soup: BeautifulSoup, suffix_map: dict[str, str], inside: bool = False):
+    if not inside:
+        # One walk of the tree for all the tag names, instead of one find_all() per name.
+        # Suffixes go after the tags, so the order the tags are visited in doesn't change the result.
+        for tag in soup.find_all(list(suffix_map)):
+            # Skip empty tags
+            if tag.text.strip():
+                tag.insert_after(suffix_map[tag.name])
+        return
+    
+    # Suffixes go into the last string of the tags, where nested tags (e.g. <p> in <li>) stack their suffixes,
+    # so keep the suffix_map order
     for tag_name, suffix in suffix_map.items():
         tags = soup.find_all(tag_name)
         for tag in tags:
             # Skip empty tags
             if not tag.text.strip():
                 continue
-            
-            if inside:
-                _bs_append_suffix_inside(tag, suffix)
-            else:
-                tag.insert_after(suffix)
+            _bs_append_suffix_inside(tag, suffix)
     pass 
 
 def append_suffix_to_tags(html_text: str, suffix_map: dict[str, str], inside: bool = False) -> str:
@@ -110,6 +125,67 @@ def append_suffix_to_tags(html_text: str, suffix_map: dict[str, str], inside: bo
     bs_append_suffix_to_tags(soup, suffix_map, inside)
     return str(soup)
 
+def _parse_xml_or_none(html_text: str) -> ET._Element | None:
+    """
+    `parse_xml`, but returns None for a document without any element (empty, whitespace-only or plain text),
+    where BeautifulSoup gives an empty tree.
+    """
+    try:
+        return parse_xml(html_text)
+    except ET.XMLSyntaxError:
+        return None
+
+def extract_body_text_with_suffix(html_text: str, suffix_map: dict[str, str]) -> str:
+    """
+    Returns the text content of <body> (or of the whole document if there is no body),
+    with suffix appended after each non-empty tag in suffix_map.
+
+    Same result as `bs_append_suffix_to_tags(soup, suffix_map)` + `soup.body.get_text()`,
+    but works on a lxml tree, which is much cheaper than building a BeautifulSoup tree.
+    """
+    root = _parse_xml_or_none(html_text)
+    if root is None:
+        return ""
+    for elem in root.iter(ET.Element):
+        # Collapse whitespace-only strings the way BeautifulSoup does ('\n' if it contains a newline, else ' ').
+        # Only ASCII whitespace counts, strings of e.g. '\xa0' or '\u3000' are kept as they are
+        if elem.text and not elem.text.strip(_ASCII_SPACES):
+            elem.text = "\n" if "\n" in elem.text else " "
+        if elem.tail and not elem.tail.strip(_ASCII_SPACES):
+            elem.tail = "\n" if "\n" in elem.tail else " "
+        
+        suffix = suffix_map.get(ET.QName(elem).localname)
+        if suffix is None:
+            continue
+        # Skip empty tags. tostring(method="text") builds the whole text in C, 
+        # instead of yielding every text node to Python like "".join(elem.itertext())
+        if not ET.tostring(elem, method="text", encoding="unicode", with_tail=False).strip():
+            continue
+        elem.tail = suffix + (elem.tail or "")
+    
+    body = root.find(".//{*}body")
+    if body is None:
+        body = root
+    return ET.tostring(body, method="text", encoding="unicode", with_tail=False)
+
+def extract_marked_segments(html_text: str, tag_name: str = SEG_TAG, mark_attr: str = SEG_MARK_ATTR) -> list[tuple[str | None, str]]:
+    """
+    Returns (id, text) of every `tag_name` element having `mark_attr` (the segments wrapped by `html_segment_and_wrap`),
+    in document order.
+
+    Same result as `soup.select(f"{tag_name}[{mark_attr}]")`, without building a BeautifulSoup tree.
+    """
+    root = _parse_xml_or_none(html_text)
+    if root is None:
+        return []
+    # root.iter("{*}tag") is faster than a precompiled XPath here, 
+    # and tostring(method="text") is ~3x faster than "".join(elem.itertext())
+    return [
+        (elem.get("id"), ET.tostring(elem, method="text", encoding="unicode", with_tail=False))
+        for elem in root.iter(f"{{*}}{tag_name}")
+        if elem.get(mark_attr) is not None
+    ]
+
 # TODO: 先分句，得到 text_segments, 然后再去原 html 中匹配每个分句进行切分。
 def html_segment_and_wrap2(html_text: str, wrapping_tag: str = "span") -> str:
     """
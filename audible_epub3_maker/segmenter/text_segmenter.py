@@ -22,6 +22,12 @@ ABBRS_NON_TERMINAL = set(["Mr.", "Mrs.", "Ms.", "Dr.", "Prof."])
 ABBRS_MAY_TERMINAL = set(["U.S.", "U.S.A.", "U.K.", "U.N.", "Inc.", "Ltd."])
 ABBREVIATIONS = sorted(ABBRS_NON_TERMINAL | ABBRS_MAY_TERMINAL, key=len, reverse=True)
 
+# Precompiled patterns for normalize_newlines()
+_RE_NL_RUN = re.compile(r"\n(?:\s*\n)*")  # a single newline, or multiple newlines (with whitespaces between)
+_RE_ANY_NL = re.compile(r"\n+")
+_RE_LINE = re.compile(r"[^\n]*\n|[^\n]+")  # a line, with its trailing newline
+_RE_LAST_SPACE = re.compile(r".*\s", re.DOTALL)  # everything up to (and including) the last whitespace
+
 def replace_non_terminal_dot(text: str, replacement: str = "_DOT_") -> str:
     """Replaces non-terminal dots in the text with a specified replacement string.
     
@@ -90,11 +96,10 @@ def normalize_newlines(text: str, mode: str) -> str:
     if mode == "single":
         return text
     elif mode == "multi":
-        tmp = re.sub(r"\n(?:\s*\n)+", "_#NLINE#_", text)    # 多个换行 => 标记
-        tmp = re.sub(r"\n", " ", tmp)                       # 单个换行 => 空格
-        return tmp.replace("_#NLINE#_", "\n")               # 多个换行 => 单个换行
+        # 单个换行 => 空格, 多个换行 => 单个换行 (one pass)
+        return _RE_NL_RUN.sub(lambda m: " " if len(m.group()) == 1 else "\n", text)
     elif mode == "none":
-        return re.sub(r"\n+", " ", text)
+        return _RE_ANY_NL.sub(" ", text)
     else:
         raise ValueError(f"Unsupported newline_mode: {mode}")
     
@@ -140,6 +145,50 @@ def segment_text_by_re(text: str) -> list:
     return [f for f in res_fragments]
 
 
+def pack_text_into_chunks(text: str, max_chars: int) -> list[str]:
+    """
+    Packs the lines (paragraphs) of text into chunks of at most max_chars.
+    A line longer than max_chars is split at sentence ends, a sentence longer than max_chars
+    at its last whitespace before the limit (or hard cut if there is none).
+
+    Joining the chunks gives back the text, whitespace-only chunks are kept (callers filter them if needed).
+    """
+    text_chunks = []
+    current_parts: list[str] = []
+    current_len = 0
+    for line in _RE_LINE.findall(text):
+        if len(line) <= max_chars:
+            pieces = [line]
+        else:
+            sentences = segment_text_by_re(line)
+            if "".join(sentences) != line:  # segmentation is not lossless (e.g., text containing "_DOT_")
+                sentences = [line]
+            pieces = [piece for sentence in sentences for piece in _split_long_sentence(sentence, max_chars)]
+        
+        for piece in pieces:
+            if current_len + len(piece) > max_chars and current_parts:
+                text_chunks.append("".join(current_parts))
+                current_parts = [piece]
+                current_len = len(piece)
+            else:
+                current_parts.append(piece)
+                current_len += len(piece)
+    if current_parts:
+        text_chunks.append("".join(current_parts))
+    return text_chunks
+
+
+def _split_long_sentence(sentence: str, max_chars: int) -> list[str]:
+    pieces = []
+    while len(sentence) > max_chars:
+        m = _RE_LAST_SPACE.match(sentence, 0, max_chars)
+        cut = m.end() if m else max_chars
+        pieces.append(sentence[:cut])
+        sentence = sentence[cut:]
+    pieces.append(sentence)
+    return pieces
+
+
 def is_readable(text: str) -> bool:
     """
     Checks if the text contains any readable characters (letters or numbers), supporting multiple languages.
@@ -1,28 +1,115 @@
-import logging, re, html
+import logging, html, functools, threading
+from concurrent.futures import ThreadPoolExecutor
+from collections import deque
+from collections.abc import Iterator
 from pathlib import Path
-from bs4 import BeautifulSoup
-from rapidfuzz import fuzz
 import azure.cognitiveservices.speech as speechsdk
 
 from audible_epub3_maker.utils import helpers
 from audible_epub3_maker.utils.types import WordBoundary, TTSEmptyAudioError, TTSEmptyContentError
-from audible_epub3_maker.utils.constants import BEAUTIFULSOUP_PARSER, SEG_MARK_ATTR, SEG_TAG
+from audible_epub3_maker.utils.constants import SEG_MARK_ATTR, SEG_TAG
 from audible_epub3_maker.config import AZURE_TTS_KEY, AZURE_TTS_REGION, settings, in_dev
-from audible_epub3_maker.tts.base_tts import BaseTTS
+from audible_epub3_maker.tts.base_tts import BaseTTS, AudioStreamWriter
+from audible_epub3_maker.tts import tts_cache
 from audible_epub3_maker.segmenter import html_segmenter, text_segmenter
 
 logger = logging.getLogger(__name__)
 # logging.getLogger('pydub.converter').setLevel(max(logging.INFO, logger.getEffectiveLevel()))
 
+# Break marks appended after block tags, the digit is the pause level (n * 500ms)
+_BREAK_MAP = {
+    "h1": "_#BRK3#",
+    "h2": "_#BRK2#",
+    "h3": "_#BRK1#",
+    "h4": "_#BRK1#",
+    "h5": "_#BRK1#",
+    "h6": "_#BRK1#",
+    "li": "_#BRK1#",
+    "p" : "_#BRK1#",
+}
+# Raw16Khz16BitMonoPcm: 16bit, 16kHz, mono, headerless PCM (chunks are written to the output file as-is)
+_OUTPUT_FORMAT = speechsdk.SpeechSynthesisOutputFormat.Raw16Khz16BitMonoPcm
+
+_BRK_PREFIX = "_#BRK"
+_BRK_LEVELS = {str(n): n for n in range(10)}
+# Chunk budget taken by an SSML break: about the speaking time of a few chars, not the length of its markup
+_BREAK_CHUNK_COST = 5
+
+
+# Default max chars per chunk, CJK languages need a smaller chunk
+_MAX_CHARS_DEFAULT = 3000
+_MAX_CHARS_CJK = 1600
+_CJK_LANGS = frozenset({"zh", "ja", "ko"})
+
+
+@functools.lru_cache(maxsize=8)
+def _max_chars_per_chunk(tts_lang: str, tts_chunk_len: int) -> int:
+    if tts_chunk_len > 0:
+        return tts_chunk_len
+    return _MAX_CHARS_CJK if tts_lang[:2].lower() in _CJK_LANGS else _MAX_CHARS_DEFAULT
+
+
+@functools.lru_cache(maxsize=8)
+def _ssml_envelope(tts_lang: str, tts_voice: str, tts_speed: float) -> tuple[str, str]:
+    """
+    Returns the (head, tail) of the SSML document, a text chunk goes between them.
+    """
+    head = (
+        f'<speak version="1.0" xmlns="http://www.w3.org/2001/10/synthesis" '
+        f'xmlns:mstts="http://www.w3.org/2001/mstts" xml:lang="{tts_lang}">\n'
+        f'  <voice name="{tts_voice}">\n'
+        f'    <prosody rate="{tts_speed}">\n'
+        '    '
+    )
+    tail = (
+        '\n'
+        '    </prosody>\n'
+        '  </voice>\n'
+        '</speak>'
+    )
+    return head, tail
+
+
 class AzureTTS(BaseTTS):
     """docstring for AzureTTS."""
 
     def __init__(self):
         super(AzureTTS, self).__init__()
         
-        pass
+        # one synthesizer per thread, created on first use and reused for all chunks,
+        # so the connection to Azure is kept open
+        self._local = threading.local()
+        self._speech_config = None  # shared by the synthesizers of all threads
+        self._executor = None  # thread pool for concurrent TTS requests, kept across html_to_speech calls
+    
+    def _get_executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=max(1, settings.tts_concurrency), 
+                                                thread_name_prefix="azure_tts")
+        return self._executor
+    
+    def _get_synthesizer(self) -> tuple[speechsdk.SpeechSynthesizer, dict]:
+        """
+        Returns the synthesizer of the current thread, and its state dict 
+        ('raw_wbs': raw word boundary events of the chunk being synthesized).
+        """
+        local = self._local
+        if getattr(local, "synthesizer", None) is None:
+            if self._speech_config is None:
+                speech_config = speechsdk.SpeechConfig(subscription=AZURE_TTS_KEY, region=AZURE_TTS_REGION)
+                speech_config.set_speech_synthesis_output_format(_OUTPUT_FORMAT)
+                self._speech_config = speech_config
+            
+            # audio_config=None: keep the synthesized audio in memory instead of playing or saving it
+            synthesizer = speechsdk.SpeechSynthesizer(speech_config=self._speech_config, audio_config=None)
+            # the callback runs on an SDK thread, so it must not look up the thread-local itself
+            state = {"raw_wbs": []}
+            synthesizer.synthesis_word_boundary.connect(lambda evt: AzureTTS.word_boundary_cb(evt, state["raw_wbs"]))
+            local.synthesizer, local.state = synthesizer, state
+        return local.synthesizer, local.state
     
     @staticmethod
+    @functools.lru_cache(maxsize=8)
     def get_break_ssml(break_time_ms: int = 500) -> str:
         """
         Returns an SSML <break> tag with the given pause time in milliseconds.
@@ -33,137 +120,152 @@ class AzureTTS(BaseTTS):
 
     @staticmethod
     def max_chars_per_chunk() -> int:
-        default = 3000
-        lang = settings.tts_lang.lower()
-        if lang.startswith(("zh", "ja", "ko")):
-            default = 1600
-        
-        if settings.tts_chunk_len <= 0:
-            return default
-        else:
-            return settings.tts_chunk_len
+        return _max_chars_per_chunk(settings.tts_lang, settings.tts_chunk_len)
 
-    def word_boundary_cb(self, evt, word_boundaries: list):
+    @staticmethod
+    def word_boundary_cb(evt, raw_wbs: list):
         """
         Callback function for Azure TTS word boundary events.
         
+        Only the raw event fields are stored here (it fires once per word),
+        they are converted to WordBoundary by `to_word_boundaries` after the synthesis.
+
         Attention: This function is called in a multithreaded environment, so be careful with shared state.
         """
         # logger.debug(f"WordBoundary event: {evt.boundary_type}, audio_offset: {evt.audio_offset}, duration: {evt.duration}, \
         #              text_offset: {evt.text_offset}, word_length: {evt.word_length}, text: {evt.text}")
-        start_ms = evt.audio_offset / 10000
-        dur_ms = evt.duration.total_seconds() * 1000 if evt.duration else 0  # evt.duration is a timedelta object
-        text = evt.text
-        if evt.text_offset < 0 and evt.word_length > 0:
-            # logger.warning(f"Negative text offset: 【{evt.text_offset}】. Text: 【{evt.text}】")
-            text = evt.text.split()[0]
-            
-        wb = WordBoundary(
-            start_ms = start_ms,
-            end_ms = start_ms + dur_ms,
-            text = text,
-        )
-        word_boundaries.append(wb)
-        # logger.debug(f"wb_list @{id(word_boundaries)}, wb: {wb}")
-        pass
+        raw_wbs.append((evt.audio_offset, evt.duration, evt.text, evt.text_offset, evt.word_length))
 
+    @staticmethod
+    def to_word_boundaries(raw_wbs: list[tuple]) -> list[WordBoundary]:
+        """
+        Converts the raw word boundary events collected by `word_boundary_cb` to WordBoundary list.
+        """
+        word_boundaries = []
+        for audio_offset, duration, text, text_offset, word_length in raw_wbs:
+            start_ms = audio_offset / 10000  # audio_offset is in 100ns ticks
+            dur_ms = duration.total_seconds() * 1000 if duration else 0  # duration is a timedelta object
+            if text_offset < 0 and word_length > 0:
+                # logger.warning(f"Negative text offset: 【{text_offset}】. Text: 【{text}】")
+                text = text.split()[0]
+            # whole milliseconds are all the SMIL clock values can express, sub-ms fractions are just bytes to carry
+            word_boundaries.append(WordBoundary(start_ms=round(start_ms), end_ms=round(start_ms + dur_ms), text=text))
+        return word_boundaries
 
-    def _break_html_into_text_chunks(self, html_text: str) -> list[str]:
-        """将 HTML 正文内容切分成多个文本块 (会引入 SSML break 标签)，每个块的大小不超过 max_chars_per_chunk。
+
+    @staticmethod
+    def _break_html_into_text_chunks(html_text: str, newline_mode: str, max_chars: int) -> Iterator[str]:
+        """将 HTML 正文内容切分成多个文本块 (会引入 SSML break 标签)，每个块的大小不超过 max_chars。
+
+        Pure function (no access to settings), so it can be run in any thread or process.
+        Chunks are yielded as soon as they are packed, so the caller can send the first TTS request early.
 
         Args:
             html_text (str): _description_
+            newline_mode (str): see `text_segmenter.normalize_newlines`
+            max_chars (int): max chars per chunk
 
-        Returns:
-            list[str]: _description_
+        Yields:
+            str: text chunk
         """
         # 1. 先将 HTML 分句，以及添加 SSML break 标签, 得到 sentences_and_ssml_breaks 列表。
-        break_map = {
-            "h1": "_#BRK3#",
-            "h2": "_#BRK2#",
-            "h3": "_#BRK1#",
-            "h4": "_#BRK1#",
-            "h5": "_#BRK1#",
-            "h6": "_#BRK1#",
-            "li": "_#BRK1#",
-            "p" : "_#BRK1#",
-        }
         # 1.1 给 HTML 中指定的标签尾部添加 #BRK 标记 (因为 h1 的文字经常没有句号)
-        soup = BeautifulSoup(html_text, BEAUTIFULSOUP_PARSER)
-        html_segmenter.bs_append_suffix_to_tags(soup, suffix_map=break_map)
-        # html_with_break_mark = html_segmenter.append_suffix_to_tags(html_text, suffix_map=break_map)
-        # logger.debug(f"HTML with BREAK mark: \n{html_with_break_mark}")
-        body_text = soup.body.get_text() if soup.body else soup.get_text()
+        body_text = html_segmenter.extract_body_text_with_suffix(html_text, suffix_map=_BREAK_MAP)
         
         # 1.2 处理换行符
-        cleaned_text = text_segmenter.normalize_newlines(body_text, settings.newline_mode)
+        cleaned_text = text_segmenter.normalize_newlines(body_text, newline_mode)
 
         # 1.3 带着 #BRK 标记做分句
         sentences_with_inline_break_mark = text_segmenter.segment_text_by_re(cleaned_text)
         # logger.debug(f"Sentences with inline break mark: \n{sentences_with_inline_break_mark}")
         
         # 1.4 替换 #BRK 标记为 SSML 支持的 <break 标签>
+        # (plain str.find scan, the marks are fixed strings "_#BRK<n>#")
         sentences_and_ssml_breaks = []
-        break_pattern = re.compile(r"(_#BRK\d#)")
         for sentence_with_break in sentences_with_inline_break_mark:
-            segs = break_pattern.split(sentence_with_break)
-            for idx, seg in enumerate(segs):
-                if idx % 2 == 1:  # odd index is break
-                    n = int(seg[5]) if seg.startswith("_#BRK") else 1
-                    sentences_and_ssml_breaks.append(AzureTTS.get_break_ssml(n * 500))
-                else:  # even index is text
-                    sentences_and_ssml_breaks.append(html.escape(seg))  # escape HTML entities
+            pos = 0  # start of the pending text
+            search_pos = 0
+            while (mark_pos := sentence_with_break.find(_BRK_PREFIX, search_pos)) >= 0:
+                level = sentence_with_break[mark_pos+5:mark_pos+6]
+                if level not in _BRK_LEVELS or sentence_with_break[mark_pos+6:mark_pos+7] != "#":
+                    search_pos = mark_pos + 1  # not a break mark, keep it as text
+                    continue
+                if mark_pos > pos:
+                    text = html.escape(sentence_with_break[pos:mark_pos])  # escape HTML entities
+                    sentences_and_ssml_breaks.append((text, len(text)))
+                sentences_and_ssml_breaks.append((AzureTTS.get_break_ssml(_BRK_LEVELS[level] * 500), _BREAK_CHUNK_COST))
+                pos = search_pos = mark_pos + 7
+            if pos < len(sentence_with_break):
+                text = html.escape(sentence_with_break[pos:])
+                sentences_and_ssml_breaks.append((text, len(text)))
         # logger.debug(f"Sentences (and ssml breaks): {sentences_and_ssml_breaks}")
 
-        # 2. 将 sentences_and_ssml_breaks 按 max_bytes_per_request 组合成 text_chunks 给 Azure TTS 使用。
-        text_chunks = []
-        current_chunk = ""
-        for segment in sentences_and_ssml_breaks:
-            # if len(current_chunk.encode('utf-8')) + len(segment.encode('utf-8')) > self.max_bytes_per_request:
-            if len(current_chunk) + len(segment) > AzureTTS.max_chars_per_chunk():
-                text_chunks.append(current_chunk)
-                current_chunk = segment
+        # 2. 将 sentences_and_ssml_breaks 按 max_chars 组合成 text_chunks 给 Azure TTS 使用。
+        # (each segment counts its spoken size, so break tags don't eat up the chunk budget with markup)
+        current_parts: list[str] = []
+        current_len = 0
+        for segment, size in sentences_and_ssml_breaks:
+            if current_len + size > max_chars and current_parts:
+                yield "".join(current_parts)
+                current_parts = [segment]
+                current_len = size
             else:
-                current_chunk += segment
+                current_parts.append(segment)
+                current_len += size
+        current_chunk = "".join(current_parts)
         if current_chunk.strip():  # skip empty chunk
-            text_chunks.append(current_chunk)
-        
-        # logger.debug(f"Text chunks [{len(text_chunks)}]: {text_chunks}")
-        return text_chunks
+            yield current_chunk
 
     
-    def _text_to_speech(self, text: str, output_file: Path) -> tuple[bytes, list[WordBoundary]]:
-        word_boundaries = []
-        speech_config = speechsdk.SpeechConfig(subscription=AZURE_TTS_KEY, region=AZURE_TTS_REGION)
-        speech_config.set_speech_synthesis_output_format(speechsdk.SpeechSynthesisOutputFormat.Riff16Khz16BitMonoPcm)
+    def _text_to_speech(self, text: str) -> tuple[bytes, list[WordBoundary]]:
+        """
+        Synthesizes a text chunk (SSML fragment) and returns its audio (raw PCM bytes, see `_OUTPUT_FORMAT`) and word boundaries.
 
-        audio_config = speechsdk.audio.AudioOutputConfig(filename=str(output_file))
-        synthesizer = speechsdk.SpeechSynthesizer(speech_config=speech_config, audio_config=audio_config)
-        synthesizer.synthesis_word_boundary.connect(lambda evt, wb_list=word_boundaries: self.word_boundary_cb(evt, wb_list))
+        The audio is streamed back in memory via `AudioDataStream`, nothing is written to disk.
+        """
+        ssml_head, ssml_tail = _ssml_envelope(settings.tts_lang, settings.tts_voice, settings.tts_speed)
+        ssml = ssml_head + text + ssml_tail
+        
+        cache_key = None
+        if settings.tts_cache:
+            cache_key = tts_cache.make_key("azure", _OUTPUT_FORMAT.name, ssml)
+            if (cached := tts_cache.load(cache_key)) is not None:
+                return cached
+        
+        synthesizer, state = self._get_synthesizer()
+        state["raw_wbs"] = raw_wbs = []
 
-        ssml = (
-            f'<speak version="1.0" xmlns="http://www.w3.org/2001/10/synthesis" '
-            f'xmlns:mstts="http://www.w3.org/2001/mstts" xml:lang="{settings.tts_lang}">\n'
-            f'  <voice name="{settings.tts_voice}">\n'
-            f'    <prosody rate="{settings.tts_speed}">\n'
-            f'    {text}\n'
-            f'    </prosody>\n'
-            f'  </voice>\n'
-            f'</speak>'
-        )
+        # start_speaking returns as soon as the first audio bytes arrive
+        result = synthesizer.start_speaking_ssml_async(ssml).get()
+        if result.reason == speechsdk.ResultReason.Canceled:
+            self._raise_synthesis_error(result.reason, result.cancellation_details, ssml)
+        
+        audio_data = bytearray()
+        audio_stream = speechsdk.AudioDataStream(result)
+        buffer = bytes(32768)  # the SDK fills this (immutable) bytes object in place
+        while (filled_size := audio_stream.read_data(buffer)) > 0:
+            audio_data += buffer[:filled_size]
         
-        result = synthesizer.speak_ssml_async(ssml).get()
-        if result.reason == speechsdk.ResultReason.SynthesizingAudioCompleted:
-            logger.debug(f"Speech synthesized to {output_file}")
-            logger.debug(f"  data size: {len(result.audio_data)/1024:.2f} KB")
-        else:
-            logger.error(f"Speech synthesis failed: {result.reason}")
-            logger.error(f"  Error details: {result.cancellation_details.error_details if result.cancellation_details else 'No error details'}")
-            logger.debug(f"  Error SSML: {ssml}")
-
-            raise RuntimeError(f"Speech synthesis failed for reason: {result.reason}. {result.cancellation_details.error_details}")
+        if audio_stream.status == speechsdk.StreamStatus.Canceled:
+            self._raise_synthesis_error(audio_stream.status, audio_stream.cancellation_details, ssml)
         
-        return result.audio_data, word_boundaries
+        logger.debug(f"Speech synthesized, data size: {len(audio_data)/1024:.2f} KB")
+        audio_data, word_boundaries = bytes(audio_data), AzureTTS.to_word_boundaries(raw_wbs)
+        if cache_key:
+            tts_cache.save(cache_key, audio_data, word_boundaries)
+        return audio_data, word_boundaries
+
+
+    def _raise_synthesis_error(self, reason, cancellation_details, ssml: str):
+        # the synthesizer may be left with an expired token or a broken connection, 
+        # drop it so the next chunk on this thread starts with a fresh one
+        self._local.synthesizer = None
+        error_details = cancellation_details.error_details if cancellation_details else 'No error details'
+        logger.error(f"Speech synthesis failed: {reason}")
+        logger.error(f"  Error details: {error_details}")
+        logger.debug(f"  Error SSML: {ssml}")
+
+        raise RuntimeError(f"Speech synthesis failed for reason: {reason}. {error_details}")
 
 
     def html_to_speech(self, html_text: str, output_file: Path, metadata: dict|None = None) -> list[WordBoundary]:
@@ -175,6 +277,7 @@ class AzureTTS(BaseTTS):
         2. Synthesizes each chunk using TTS and collects word boundary metadata.
         3. Merges all audio chunks and boundary data into a single output.
         4. Saves the merged audio to the specified output path with optional metadata.
+           (3 and 4 are streamed: each chunk is written to the output file when its synthesis is done)
 
         Args:
             html_text (str): HTML content to be synthesized into speech.
@@ -189,44 +292,62 @@ class AzureTTS(BaseTTS):
         metadata.update({"artist": f"Azure TTS - {settings.tts_voice}", 
                          "language": f"{settings.tts_lang}",})
         
-        # 1. split
-        text_chunks = self._break_html_into_text_chunks(html_text)
-        if not text_chunks:
-            raise TTSEmptyContentError("Input HTML contains no valid text content.")
-        if in_dev():
-            merged_texts = "\n\n##### chunk ######\n\n".join(text_chunks)
-            text_file = output_file.with_suffix(".chunks.txt")
-            text_file.write_text(merged_texts)
+        # 1. split, and 2. tts, and 3. merge audio and word boundaries, and 4. save audio
+        # each chunk is submitted as soon as it is produced (chunks are synthesized concurrently), 
+        # and written to the output file as soon as it's ready (in order), the whole audio is never held in memory.
+        # At most `window` chunks are in flight: one ahead of the busy threads, 
+        # so finished-but-unwritten audio buffers don't pile up while an earlier chunk is still running.
+        executor = self._get_executor()
+        window = max(1, settings.tts_concurrency) + 1
+        text_chunks = []
+        futures = deque()
+        merged_wbs = []
+        # dev-mode debug files are written by their own thread, overlapping with the synthesis and encoding
+        dev_writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="azure_tts_dev") if in_dev() else None
+        dev_writes = []
+        try:
+            with AudioStreamWriter(output_file, sample_width=2, frame_rate=16000, channels=1, metadata=metadata) as writer:
+                def write_oldest():
+                    audio_chunk, word_boundaries = futures.popleft().result()
+                    merged_wbs.extend(self.shift_word_boundaries(word_boundaries, writer.duration_ms))
+                    # headerless PCM, the writer adds the file header once
+                    writer.write(self.fade_edges(audio_chunk, sample_width=2, frame_rate=16000, channels=1))
+                    logger.debug(f"Audio [{len(text_chunks) - len(futures) - 1}]: written, total duration = {writer.duration_ms:.0f}ms")
+
+                for text_chunk in self._break_html_into_text_chunks(html_text, settings.newline_mode, self.max_chars_per_chunk()):
+                    if len(futures) >= window:
+                        write_oldest()
+                    text_chunks.append(text_chunk)
+                    futures.append(executor.submit(self._text_to_speech, text_chunk))
+                if not text_chunks:
+                    raise TTSEmptyContentError("Input HTML contains no valid text content.")
+                
+                # debug file is written after the requests are sent, so it doesn't delay the first one
+                if in_dev():
+                    merged_texts = "\n\n##### chunk ######\n\n".join(text_chunks)
+                    text_file = output_file.with_suffix(".chunks.txt")
+                    dev_writes.append(dev_writer.submit(text_file.write_text, merged_texts))
+                
+                while futures:
+                    write_oldest()
+                
+                # 5. save wbs file (while the writer finishes the output file)
+                if in_dev():
+                    wbs_file = output_file.with_suffix(".wbs.txt")
+                    dev_writes.append(dev_writer.submit(helpers.save_wbs_as_json, merged_wbs, wbs_file))
+        except BaseException:
+            for future in futures:
+                future.cancel()
+            raise
+        finally:
+            if dev_writer:
+                dev_writer.shutdown(wait=True)
+        for future in dev_writes:
+            future.result()  # raises the write error, if any
         
-        # 2. tts
-        chunk_results = []
-        for i, text_chunk in enumerate(text_chunks):
-            audio_chunk_file = output_file.parent / f"{output_file.stem}.part{i}.wav"
-            audio_chunk, word_boundaries = self._text_to_speech(text_chunk, audio_chunk_file)
-            chunk_results.append({
-                "idx": i,
-                "text": text_chunk,
-                "audio_file": audio_chunk_file,
-                "audio_data": audio_chunk,
-                "wbs": word_boundaries,
-            })
-
-        # 3. merge audio and word boundaries
-        merged_audio, merged_wbs = self.merge_audios_and_word_boundaries(chunk_results)
-        if merged_audio is None or len(merged_audio) == 0:
+        if writer.frames == 0:
+            output_file.unlink(missing_ok=True)
             raise TTSEmptyAudioError("TTS returned empty or invalid audio data.")
-        
-        # 4. save merged audio
-        self.save_audio(merged_audio, output_file, metadata)
-        
-        # 5. save wbs file
-        if in_dev():
-            wbs_file = output_file.with_suffix(".wbs.txt")
-            helpers.save_wbs_as_json(merged_wbs, wbs_file)
-        
-        # 5. clear temp audio_chunk
-        for chunk in chunk_results:
-            chunk["audio_file"].unlink(missing_ok=True)
 
         return merged_wbs
   
@@ -376,11 +497,8 @@ def test():
     wbs_file = DEV_OUTPUT_DIR / "output.wbs"
     helpers.save_wbs_as_json(wb_list, wbs_file)
 
-    soup = BeautifulSoup(html, BEAUTIFULSOUP_PARSER)
-    segment_elems = soup.select(f"{SEG_TAG}[{SEG_MARK_ATTR}]")
-    # segments = [ tag.get_text() for tag in segment_elems]
-    idx_segments = [(tag.get("id"), tag.get_text()) for tag in segment_elems]
-    logger.debug(f"segments: {idx_segments}")
+    idx_segments = html_segmenter.extract_marked_segments(html, SEG_TAG, SEG_MARK_ATTR)
+    logger.debug("segments: %s", idx_segments)  # lazy, the list is only formatted if DEBUG is enabled
     alignments = helpers.force_alignment(idx_segments, wb_list)
     # logger.debug(alignments)
     print(helpers.generate_smil_content("text/01.smil", "text/ch01.xhtml", "audio/aud_01.mp3", alignments))
@@ -1,8 +1,8 @@
-import logging, io
+import logging, sys, wave, subprocess, tempfile
 from pathlib import Path
-from pydub import AudioSegment
+from pydub.utils import get_encoder_name
+from pydub.exceptions import CouldntEncodeError
 
-from audible_epub3_maker.config import in_dev
 from audible_epub3_maker.utils.types import WordBoundary
 
 logger = logging.getLogger(__name__)
@@ -27,96 +27,142 @@ class BaseTTS(object):
         pass
 
     
-    @classmethod
-    def merge_audios_and_word_boundaries(cls, 
-                                         chunk_results: list[dict],
-                                         key: str = "audio_file"
-                                         ) -> tuple[AudioSegment, list[WordBoundary]]:
+    @staticmethod
+    def shift_word_boundaries(word_boundaries: list[WordBoundary], offset_ms: float) -> list[WordBoundary]:
         """
-        Merges multiple audio chunks and their corresponding word boundaries into a single audio stream
-        and a unified word boundary list with adjusted timestamps.
-
-        Args:
-            chunk_results: List of dicts with:
-                - `key`: key_name poins to the WAV data (e.g., 'audio_file' or 'audio_data')
-                - 'wbs': list of WordBoundary
-            key: Key_name in each chunk dict pointing to WAV data (file Path or BytesIO)
-
-        Returns:
-            - merged_audio: Combined AudioSegment
-            - merged_wbs: List of WordBoundary with updated start/end times
+        Returns copies of the word boundaries moved by offset_ms. 
+        This runs once per word of a chapter, so the dataclass is built with positional arguments (faster than keywords).
         """
-        merged_audio = AudioSegment.empty()
-        merged_wbs = []
-        current_offset = 0.0
-
-        for idx, chunk in enumerate(chunk_results):
-            audio_file = chunk[key]
-            wbs: list[WordBoundary] = chunk["wbs"]
-
-            # 1. Merge audio
-            # AudioSegment.from_file 支持读取文件，也支持读取 file-like 对象 (BytesIO)
-            audio = AudioSegment.from_file(audio_file, format="wav")
-            merged_audio += audio
-            
-            # 2. Merge and shift word boundaries
-            for wb in wbs:
-                adjusted_wb = WordBoundary(
-                    start_ms = wb.start_ms + current_offset,
-                    end_ms = wb.end_ms + current_offset,
-                    text = wb.text,
-                )
-                merged_wbs.append(adjusted_wb)
-            
-            # 3. Update offset
-            current_offset += len(audio)
-            logger.debug(f"Audio [{idx}] {audio_file}: duration = {len(audio)}ms")
-        
-        logger.debug(f"Total merged audio duration (calculated): {current_offset}ms")
-        return merged_audio, merged_wbs
-    
+        return [WordBoundary(wb.start_ms + offset_ms, wb.end_ms + offset_ms, wb.text) for wb in word_boundaries]
 
-    @classmethod
-    def merge_audios(cls, audio_files: list[Path | io.BytesIO]) -> AudioSegment:
-        """
-        Merges a list of audio files (WAV format) into a single AudioSegment.
 
-        Args:
-            audio_files: List of audio inputs, each being either:
-                      - a Path to a WAV file
-                      - or a BytesIO object containing WAV data
-
-        Returns:
-            AudioSegment: The concatenated audio segment.
+    @staticmethod
+    def fade_edges(pcm: bytes | memoryview, sample_width: int, frame_rate: int, channels: int, 
+                   fade_ms: float = 2.0) -> bytes | bytearray | memoryview:
         """
-        merged_audio = AudioSegment.empty()
-        for idx, audio_file in enumerate(audio_files):
-            audio = AudioSegment.from_file(audio_file, format="wav")
-            merged_audio += audio
-            logger.debug(f"Audio [{idx}] {audio_file}: duration = {len(audio)}ms")
-
-        logger.debug(f"Total merged audio duration: {len(merged_audio)}ms")
-        return merged_audio
-    
+        Applies a short linear fade-in and fade-out to the edges of a PCM chunk, 
+        so chunks synthesized separately don't click where they are joined back to back.
 
-    @classmethod
-    def save_audio(cls, audio: AudioSegment, output_file: Path, metadata: dict|None = None):
-        """
-        Save an AudioSegment to a file, with optional metadata.
-
-        Supports .mp3 and .wav formats. Falls back to .mp3 if unsupported.
+        Only 16bit little-endian PCM of whole frames is faded, other data is returned as-is.
         """
-        metadata = metadata or {}
-
-        export_format = output_file.suffix.lower().lstrip('.') or "mp3"
+        if sample_width != 2 or sys.byteorder != "little" or len(pcm) % (sample_width * channels):
+            return pcm
+        
+        out = bytearray(pcm)
+        samples = memoryview(out).cast("h")
+        fade_frames = min(int(frame_rate * fade_ms / 1000), len(samples) // channels // 2)
+        last = len(samples) - channels  # first sample of the last frame
+        for i in range(fade_frames):
+            gain = i / fade_frames
+            for c in range(channels):
+                head, tail = i * channels + c, last - i * channels + c
+                samples[head] = int(samples[head] * gain)
+                samples[tail] = int(samples[tail] * gain)
+        samples.release()
+        return out
+
+
+class AudioStreamWriter(object):
+    """
+    Writes PCM chunks to an audio file as they come, so the whole audio is never held in memory.
+
+    - .wav: written directly with the `wave` module
+    - .mp3: PCM is piped to an ffmpeg process (same encoder and tags as `AudioSegment.export`)
+    Unsupported formats fall back to .mp3.
+
+    Usage:
+        with AudioStreamWriter(output_file, sample_width=2, frame_rate=16000, channels=1, metadata=metadata) as writer:
+            writer.write(pcm)
+    If the block raises, the partial output file is removed.
+    """
+
+    def __init__(self, output_file: Path, sample_width: int, frame_rate: int, channels: int, metadata: dict|None = None):
+        self.output_file = Path(output_file)
+        self.sample_width = sample_width
+        self.frame_rate = frame_rate
+        self.channels = channels
+        self.frame_width = sample_width * channels
+        self.frames = 0
+
+        export_format = self.output_file.suffix.lower().lstrip('.') or "mp3"
         if export_format not in ["wav", "mp3"]:
             logger.warning(f"Unsupported output format '{export_format}', falling back to 'mp3'")
             export_format = "mp3"
-        
-        audio.export(str(output_file), format=export_format, tags=metadata)
-        logger.debug(f"Audio saved to {output_file}")
+        self.format = export_format
+
+        self._wav = None
+        self._proc = None
+        self._stderr = None
+        self._closed = False
+        if export_format == "wav":
+            self._wav = wave.open(str(self.output_file), "wb")
+            self._wav.setsampwidth(sample_width)
+            self._wav.setframerate(frame_rate)
+            self._wav.setnchannels(channels)
+        else:
+            command = [
+                get_encoder_name(), "-y", "-loglevel", "error",
+                "-f", f"s{sample_width * 8}le", "-ar", str(frame_rate), "-ac", str(channels), "-i", "pipe:0",
+            ]
+            for key, value in (metadata or {}).items():
+                command.extend(["-metadata", f"{key}={value}"])
+            command.extend(["-id3v2_version", "3", "-f", "mp3", str(self.output_file)])
+            
+            self._stderr = tempfile.TemporaryFile()  # not a pipe, so ffmpeg never blocks on a full stderr pipe
+            self._proc = subprocess.Popen(command, stdin=subprocess.PIPE, stdout=subprocess.DEVNULL, stderr=self._stderr)
+        pass
 
-        # check audio time length
-        if in_dev():
-            final_audio = AudioSegment.from_file(output_file, format=export_format)
-            logger.debug(f"Final audio duration (actual): {len(final_audio)}ms")
\ No newline at end of file
+    @property
+    def duration_ms(self) -> float:
+        """Duration of the audio written so far."""
+        return self.frames * 1000 / self.frame_rate
+
+    def write(self, pcm: bytes | memoryview):
+        if self._wav:
+            self._wav.writeframesraw(pcm)
+        else:
+            self._proc.stdin.write(pcm)
+        self.frames += len(pcm) // self.frame_width
+
+    def close(self):
+        """Finishes the output file. Calling it again is a no-op."""
+        if self._closed:
+            return
+        self._closed = True
+        if self._wav:
+            self._wav.close()  # also patches the header sizes
+        elif self._proc:
+            self._proc.stdin.close()
+            returncode = self._proc.wait()
+            self._stderr.seek(0)
+            err = self._stderr.read().decode(errors="replace")
+            self._stderr.close()
+            if returncode != 0:
+                raise CouldntEncodeError(f"Encoding failed. ffmpeg returned error code: {returncode}\n\n{err}")
+        logger.debug(f"Audio saved to {self.output_file}, duration: {self.duration_ms:.0f}ms")
+
+    def abort(self):
+        """Stops writing and removes the partial output file (also removes the file if already closed)."""
+        if not self._closed:
+            self._closed = True
+            if self._wav:
+                self._wav.close()
+            elif self._proc:
+                self._proc.kill()
+                try:
+                    self._proc.stdin.close()
+                except OSError:
+                    pass  # broken pipe
+                self._proc.wait()
+                self._stderr.close()
+        self.output_file.unlink(missing_ok=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+        return False
@@ -1,25 +1,101 @@
-import logging, io
+import logging, re, threading, functools
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
 import soundfile as sf
+import torch
 from pathlib import Path
 from kokoro import KPipeline
-from bs4 import BeautifulSoup
 
-from audible_epub3_maker.tts.base_tts import BaseTTS
+from audible_epub3_maker.tts.base_tts import BaseTTS, AudioStreamWriter
+from audible_epub3_maker.tts import tts_cache
 from audible_epub3_maker.config import settings, in_dev
 from audible_epub3_maker.utils import helpers
-from audible_epub3_maker.utils.constants import BEAUTIFULSOUP_PARSER
 from audible_epub3_maker.utils.types import WordBoundary, TTSEmptyAudioError, TTSEmptyContentError
 from audible_epub3_maker.segmenter import html_segmenter, text_segmenter
 
 logger = logging.getLogger(__name__)
 
+_REPO_ID = "hexgrad/Kokoro-82M"
+# Max chars of a text chunk sent to the pipeline, chunks are synthesized concurrently
+_MAX_CHARS_PER_CHUNK = 400
+_BYTES_PER_MS = 24000 * 2 / 1000  # 16bit, 24kHz, mono
+# settings.tts_dtype => autocast dtype of the model inference (float32 runs without autocast)
+_AUTOCAST_DTYPES = {"bfloat16": torch.bfloat16, "float16": torch.float16}
+# Kokoro doesn't read SSML <break>, the marks are replaced by newlines (a pause) after newline normalization
+_BREAK_MAP = {
+    "h1": "_#BRK#",
+    "h2": "_#BRK#",
+    "h3": "_#BRK#",
+    "h4": "_#BRK#",
+    "h5": "_#BRK#",
+    "h6": "_#BRK#",
+    "li": "_#BRK#",
+    "p" : "_#BRK#",
+}
+
+
+@functools.lru_cache(maxsize=None)
+def _resolve_dtype(dtype: str, device_type: str) -> str:
+    """
+    Returns the dtype the model actually runs with on the device (logged once per device).
+    float16 autocast is CUDA only (CPU autocast of older torch silently runs float32), bfloat16 is used instead.
+    """
+    if dtype == "float16" and device_type != "cuda":
+        logger.warning(f"float16 is not supported on {device_type}, using bfloat16 instead")
+        dtype = "bfloat16"
+    logger.info(f"Kokoro runs {dtype} on {device_type}")
+    return dtype
+
+
+def _to_pcm16(audio) -> bytes:
+    """
+    Converts float samples in [-1, 1] (numpy array or CPU torch tensor) to 16bit little-endian PCM bytes.
+    Gives the same samples as soundfile's PCM_16 encoding (scale by 32768, floor, clip), without going through an encoder.
+    """
+    if isinstance(audio, torch.Tensor):
+        audio = audio.float()  # no copy for float32, half precision output (autocast) has no numpy dtype
+    # one float32 temporary, scaled, floored and clipped in place (the input may share memory with the tensor)
+    samples = np.multiply(np.asarray(audio, dtype=np.float32), np.float32(32768))
+    np.floor(samples, out=samples)
+    np.clip(samples, -32768, 32767, out=samples)
+    return samples.astype("<i2").tobytes()
+
+
 class KokoroTTS(BaseTTS):
     
+    # loaded models by repo_id, shared by all pipelines (and threads) in the process
+    _models: dict[str, object] = {}
+    _models_lock = threading.Lock()
+
     def __init__(self):
         super(KokoroTTS, self).__init__()
         
+        # pipelines (G2P) by lang_code, one set per thread, created on first use and reused for all chapters
+        self._local = threading.local()
+        self._executor = None  # thread pool for concurrent chunk synthesis
         pass
     
+    def _get_executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=max(1, settings.tts_concurrency), 
+                                                thread_name_prefix="kokoro_tts")
+        return self._executor
+    
+    def _get_pipeline(self, lang_code: str) -> KPipeline:
+        pipelines = getattr(self._local, "pipelines", None)
+        if pipelines is None:
+            pipelines = self._local.pipelines = {}
+        
+        if lang_code not in pipelines:
+            cls = type(self)
+            with cls._models_lock:
+                # model=True: the pipeline loads the model itself (only the first time)
+                pipeline = KPipeline(lang_code=lang_code, repo_id=_REPO_ID, model=cls._models.get(_REPO_ID, True))
+                cls._models[_REPO_ID] = pipeline.model
+            pipelines[lang_code] = pipeline
+        return pipelines[lang_code]
+    
     
     @classmethod
     def download_model(cls, lang: str, voice: str):
@@ -34,85 +110,113 @@ class KokoroTTS(BaseTTS):
         pass
 
 
-    def html_to_speech(self, html_text: str, output_file: Path, metadata: dict|None = None) -> list[WordBoundary]:
-        output_file = Path(output_file)
-        metadata = metadata or {}
-        metadata.update({"artist": f"Kokoro TTS - {settings.tts_voice}", 
-                         "language": f"{settings.tts_lang}",})
-        
-        soup = BeautifulSoup(html_text, BEAUTIFULSOUP_PARSER)
-        # 1. 替换在 HTML 中 h 标签后追加 BRK 标记
-        break_map = {
-            "h1": "_#BRK#",
-            "h2": "_#BRK#",
-            "h3": "_#BRK#",
-            "h4": "_#BRK#",
-            "h5": "_#BRK#",
-            "h6": "_#BRK#",
-            "li": "_#BRK#",
-            "p" : "_#BRK#",
-        }
-        html_segmenter.bs_append_suffix_to_tags(soup, break_map)
-        
-        # 2. 获取正文
-        body_text = soup.body.get_text() if soup.body else soup.get_text()
-        # 清洗换行符
-        text = text_segmenter.normalize_newlines(body_text, settings.newline_mode)
-        # 根据 BRK 标记添加换行符 (Kokoro 不识别 SSML 的 <break> 标签，只能根据换行符做朗读的停顿)
-        text = text.replace("_#BRK#", "\n")
-        
-        # TODO: chunking
+    def _text_to_speech(self, text: str) -> tuple[bytes, list[WordBoundary]]:
+        """
+        Synthesizes a text chunk with the pipeline of the current thread, 
+        and returns its audio (16bit 24kHz mono PCM bytes) and word boundaries.
 
-        if in_dev():
-            text_file = output_file.with_suffix(".chunks.txt")
-            text_file.write_text(text)
+        Kokoro splits the text at newlines, the results are joined into one audio.
+        """
+        pipeline = self._get_pipeline(settings.tts_lang)
+        device_type = pipeline.model.device.type
+        dtype = _resolve_dtype(settings.tts_dtype, device_type)
 
-        # 剩下的就交给 Kokoro 好了，它自己会做 分句 与 chunking (不行，还是得自己做个 chunking)
-        pipeline = KPipeline(lang_code=settings.tts_lang, repo_id="hexgrad/Kokoro-82M")
-        generator = pipeline(text, voice=settings.tts_voice, speed=settings.tts_speed)
-        chunk_results = []
-        for idx, result in enumerate(generator):
+        cache_key = None
+        if settings.tts_cache:
+            # keyed by the dtype actually used, not the requested one
+            cache_key = tts_cache.make_key("kokoro", _REPO_ID, dtype, settings.tts_lang, settings.tts_voice, 
+                                           str(settings.tts_speed), text)
+            if (cached := tts_cache.load(cache_key)) is not None:
+                return cached
+        
+        # float32 runs as is, bfloat16/float16 run the model under autocast (thread-local, so per worker thread).
+        # The generator runs the model lazily, so it is consumed inside the context (a chunk is only a few results)
+        autocast_dtype = _AUTOCAST_DTYPES.get(dtype)
+        with torch.autocast(device_type, dtype=autocast_dtype, enabled=autocast_dtype is not None):
+            results = list(pipeline(text, voice=settings.tts_voice, speed=settings.tts_speed))
+        pcm_parts = []
+        word_boundaries = []
+        offset_ms = 0.0
+        for idx, result in enumerate(results):
             # KPipeline.Result → https://github.com/hexgrad/kokoro/blob/f1d129d8356dde124a5550ab88d61ba25620c0fd/kokoro/pipeline.py#L333
             tokens = result.tokens or []
             logger.debug(f"chunk [{idx}] result: {type(result)}") 
             logger.debug(f"  graphemes: {result.graphemes[:50]} ...")
             logger.debug(f"  phonemes: {result.phonemes[:50]} ...")
-            logger.debug(f"  audio length: {len(result.audio)}")
+            logger.debug(f"  audio length: {len(result.audio) if result.audio is not None else 0}")
             logger.debug(f"  tokens length: {len(tokens)}")
 
-            # audio_chunk_file = output_file.parent / f"{output_file.stem}.part{idx}.wav"
-            if result.audio is not None:
-                audio_data = io.BytesIO()
-                sf.write(audio_data, result.audio, 24000, format="WAV")
-                audio_data.seek(0)
+            # raw 16bit PCM in memory, merged without any WAV decoding
+            audio_data = _to_pcm16(result.audio) if result.audio is not None else b""
+            pcm_parts.append(audio_data)
 
-            wbs = []            
             for token in tokens:
                 if not token.text.strip():
                     continue  # skip empty token
                 if token.start_ts is None or token.end_ts is None:
                     logger.warning(f"token times error: {token}")
                     continue
-                wb = WordBoundary(start_ms = token.start_ts * 1000,
-                                  end_ms = token.end_ts * 1000,
-                                  text = token.text)
-                wbs.append(wb)
+                # positional arguments, this runs once per token (see BaseTTS.shift_word_boundaries)
+                word_boundaries.append(WordBoundary(token.start_ts * 1000 + offset_ms, token.end_ts * 1000 + offset_ms, token.text))
+            offset_ms += len(audio_data) / _BYTES_PER_MS
+        
+        audio_data = b"".join(pcm_parts)
+        if cache_key:
+            tts_cache.save(cache_key, audio_data, word_boundaries)
+        return audio_data, word_boundaries
 
-            chunk_results.append({
-                "idx": idx,
-                "text": result.graphemes,
-                # "audio_file": audio_chunk_file,
-                "audio_data": audio_data,
-                "wbs": wbs,
-            })
+
+    def html_to_speech(self, html_text: str, output_file: Path, metadata: dict|None = None) -> list[WordBoundary]:
+        output_file = Path(output_file)
+        metadata = metadata or {}
+        metadata.update({"artist": f"Kokoro TTS - {settings.tts_voice}", 
+                         "language": f"{settings.tts_lang}",})
         
-        # 3. merge audio and word boundaries
-        merged_audio, merged_wbs = self.merge_audios_and_word_boundaries(chunk_results, key="audio_data")
-        if merged_audio is None or len(merged_audio) == 0:
-            raise TTSEmptyAudioError("TTS returned empty or invalid audio data.")
+        # 1. 获取正文, 并在 h, li, p 标签后追加 BRK 标记 (one lxml pass, no BeautifulSoup tree)
+        body_text = html_segmenter.extract_body_text_with_suffix(html_text, suffix_map=_BREAK_MAP)
+        # 2. 清洗换行符
+        text = text_segmenter.normalize_newlines(body_text, settings.newline_mode)
+        # 根据 BRK 标记添加换行符 (Kokoro 不识别 SSML 的 <break> 标签，只能根据换行符做朗读的停顿)
+        text = text.replace("_#BRK#", "\n")
+        
+        # 3. chunking, at paragraphs (or sentences in a long paragraph), so the chunks can be synthesized concurrently
+        text_chunks = [chunk for chunk in text_segmenter.pack_text_into_chunks(text, _MAX_CHARS_PER_CHUNK) 
+                       if chunk.strip()]
+        if not text_chunks:
+            raise TTSEmptyContentError("Input HTML contains no valid text content.")
 
-        # 4. save merged audio
-        self.save_audio(merged_audio, output_file, metadata)
+        if in_dev():
+            text_file = output_file.with_suffix(".chunks.txt")
+            text_file.write_text("\n\n##### chunk ######\n\n".join(text_chunks))
+
+        # 4. tts, merge audio and word boundaries (16bit, 24kHz, mono), and save audio
+        # chunks are synthesized concurrently and written to the output file in order as soon as they are ready,
+        # the whole audio is never held in memory. At most `window` chunks are in flight (see AzureTTS.html_to_speech).
+        executor = self._get_executor()
+        window = max(1, settings.tts_concurrency) + 1
+        futures = deque()
+        merged_wbs = []
+        try:
+            with AudioStreamWriter(output_file, sample_width=2, frame_rate=24000, channels=1, metadata=metadata) as writer:
+                def write_oldest():
+                    audio_chunk, word_boundaries = futures.popleft().result()
+                    merged_wbs.extend(self.shift_word_boundaries(word_boundaries, writer.duration_ms))
+                    writer.write(self.fade_edges(audio_chunk, sample_width=2, frame_rate=24000, channels=1))
+
+                for text_chunk in text_chunks:
+                    if len(futures) >= window:
+                        write_oldest()
+                    futures.append(executor.submit(self._text_to_speech, text_chunk))
+                while futures:
+                    write_oldest()
+        except BaseException:
+            for future in futures:
+                future.cancel()
+            raise
+
+        if writer.frames == 0:
+            output_file.unlink(missing_ok=True)
+            raise TTSEmptyAudioError("TTS returned empty or invalid audio data.")
 
         # 5. save wbs file
         if in_dev():
@@ -141,44 +245,39 @@ def main():
     # pipeline = KPipeline(lang_code='z')
     # generator = pipeline(text, voice='zf_xiaoxiao')
     
-    chunks = []
-    for idx, result in enumerate(generator):
-        # KPipeline.Result → https://github.com/hexgrad/kokoro/blob/f1d129d8356dde124a5550ab88d61ba25620c0fd/kokoro/pipeline.py#L333
-        # kokoro 默认根据输入 text 的换行符进行分块
-        logger.debug(f"[{idx}] result: {type(result)}") 
-
-        logger.debug(f"graphemes: {result.graphemes[:50]} ...{len(result.graphemes)}")
-        logger.debug(f"phonemes: {result.phonemes[:50]} ...{len(result.phonemes)}")
-        logger.debug(f"audio length: {len(result.audio)}")
-
-        tokens = result.tokens or []
-        logger.debug(f"tokens length: {len(tokens)}")
-        for token in tokens[:5]:
-            logger.debug(f"token: {token}")
-
-        audio_chunk_file = DEV_OUTPUT_DIR / f'output{idx}.wav'
-        if result.audio is not None:
-            sf.write(DEV_OUTPUT_DIR / f'output{idx}.wav', result.audio, 24000)
-        
-        wbs = []            
-        for token in tokens:
-            wb = WordBoundary(start_ms = token.start_ts * 1000,
-                                end_ms = token.end_ts * 1000,
-                                text = token.text)
-            wbs.append(wb)
-        chunks.append({
-            "idx": idx,
-            "text": result.graphemes,
-            "audio_file": audio_chunk_file,
-            "audio_data": result.audio,
-            "wbs": wbs,
-        })
+    merged_wbs = []
+    with AudioStreamWriter(DEV_OUTPUT_DIR / "output.mp3", sample_width=2, frame_rate=24000, channels=1) as writer:
+        for idx, result in enumerate(generator):
+            # KPipeline.Result → https://github.com/hexgrad/kokoro/blob/f1d129d8356dde124a5550ab88d61ba25620c0fd/kokoro/pipeline.py#L333
+            # kokoro 默认根据输入 text 的换行符进行分块
+            logger.debug(f"[{idx}] result: {type(result)}") 
 
-        pass
-    
-    merged_audio, merged_wbs = BaseTTS.merge_audios_and_word_boundaries(chunks)
-    BaseTTS.save_audio(merged_audio, DEV_OUTPUT_DIR / "output.mp3")
+            logger.debug(f"graphemes: {result.graphemes[:50]} ...{len(result.graphemes)}")
+            logger.debug(f"phonemes: {result.phonemes[:50]} ...{len(result.phonemes)}")
+            logger.debug(f"audio length: {len(result.audio)}")
 
+            tokens = result.tokens or []
+            logger.debug(f"tokens length: {len(tokens)}")
+            for token in tokens[:5]:
+                logger.debug(f"token: {token}")
+
+            if result.audio is not None:
+                sf.write(DEV_OUTPUT_DIR / f'output{idx}.wav', result.audio, 24000)
+            
+            wbs = []            
+            for token in tokens:
+                wb = WordBoundary(start_ms = token.start_ts * 1000,
+                                    end_ms = token.end_ts * 1000,
+                                    text = token.text)
+                wbs.append(wb)
+            
+            # results are written to the output file one by one, word boundaries shifted by the audio written so far
+            merged_wbs.extend(BaseTTS.shift_word_boundaries(wbs, writer.duration_ms))
+            if result.audio is not None:
+                writer.write(_to_pcm16(result.audio))
+
+            pass
+    
     # from misaki import en
     # g2p = en.G2P()
     # ps, tokens = g2p(text)
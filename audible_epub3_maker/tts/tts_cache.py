@@ -0,0 +1,87 @@
+import logging, hashlib, json, os, tempfile
+from pathlib import Path
+
+from audible_epub3_maker.utils.constants import TTS_CACHE_DIR
+from audible_epub3_maker.utils.types import WordBoundary
+
+logger = logging.getLogger(__name__)
+
+
+def make_key(*parts: str) -> str:
+    """
+    Returns the cache key of a TTS request, parts should contain everything that affects the output audio
+    (e.g., engine, output format, SSML with voice/lang/speed).
+    """
+    h = hashlib.blake2b(digest_size=16)
+    for part in parts:
+        h.update(part.encode("utf-8"))
+        h.update(b"\0")
+    return h.hexdigest()
+
+
+def _cache_files(key: str, cache_dir: Path) -> tuple[Path, Path]:
+    sub_dir = cache_dir / key[:2]
+    return sub_dir / f"{key}.audio", sub_dir / f"{key}.wbs.cols.json"
+
+
+def _dump_wbs(word_boundaries: list[WordBoundary]) -> bytes:
+    """
+    Word boundaries are stored column-wise ({"start_ms": [...], "end_ms": [...], "text": [...]}),
+    so the field names are not repeated per word and loading builds no per-word dicts.
+    """
+    columns = {
+        "start_ms": [wb.start_ms for wb in word_boundaries],
+        "end_ms": [wb.end_ms for wb in word_boundaries],
+        "text": [wb.text for wb in word_boundaries],
+    }
+    return json.dumps(columns, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def _load_wbs(data: bytes) -> list[WordBoundary]:
+    columns = json.loads(data)
+    return list(map(WordBoundary, columns["start_ms"], columns["end_ms"], columns["text"]))
+
+
+def load(key: str, cache_dir: Path = TTS_CACHE_DIR) -> tuple[bytes, list[WordBoundary]] | None:
+    """
+    Returns cached (audio_data, word_boundaries) of the key, or None if not cached.
+    """
+    audio_file, wbs_file = _cache_files(key, cache_dir)
+    try:
+        audio_data = audio_file.read_bytes()
+        wbs = _load_wbs(wbs_file.read_bytes())
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError, TypeError, KeyError) as e:
+        logger.warning(f"Ignore broken TTS cache [{key}]: {e}")
+        return None
+
+    logger.debug(f"TTS cache hit [{key}], data size: {len(audio_data)/1024:.2f} KB")
+    return audio_data, wbs
+
+
+def save(key: str, audio_data: bytes, word_boundaries: list[WordBoundary], cache_dir: Path = TTS_CACHE_DIR):
+    """
+    Saves (audio_data, word_boundaries) of the key. Files are written atomically (temp file + rename),
+    so concurrent workers never read a partial cache entry.
+    """
+    audio_file, wbs_file = _cache_files(key, cache_dir)
+    try:
+        audio_file.parent.mkdir(parents=True, exist_ok=True)
+        wbs_data = _dump_wbs(word_boundaries)
+        # audio first: an entry counts as cached only when its wbs file exists
+        _atomic_write(audio_file, audio_data)
+        _atomic_write(wbs_file, wbs_data)
+    except OSError as e:
+        logger.warning(f"Failed to save TTS cache [{key}]: {e}")
+
+
+def _atomic_write(file: Path, data: bytes):
+    fd, tmp_name = tempfile.mkstemp(dir=file.parent, prefix=file.name, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp_name, file)
+    except BaseException:
+        Path(tmp_name).unlink(missing_ok=True)
+        raise
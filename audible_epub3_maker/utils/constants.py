@@ -10,6 +10,9 @@ BASE_DIR = Path(__file__).resolve().parent.parent.parent
 OUTPUT_DIR = BASE_DIR / "output"
 INPUT_DIR = BASE_DIR / "input"  # for test
 DEV_OUTPUT_DIR = BASE_DIR / "dev_output"  # for dev test
+CACHE_DIR = Path.home() / ".cache" / "audible-epub3-maker"
+TTS_CACHE_DIR = CACHE_DIR / "tts"  # for --tts_cache
+AZURE_VOICES_CACHE_TTL = 7 * 24 * 3600  # seconds, the voice list of a region rarely changes
 
 # logging config
 LOG_DIR = BASE_DIR / "logs"
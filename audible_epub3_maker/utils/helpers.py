@@ -1,12 +1,13 @@
-import logging, math, json, os, sys, time
+import logging, math, json, os, sys, time, bisect, io, functools, itertools
+from typing import TextIO
 import requests
 from html import escape
 from pathlib import Path
 from rapidfuzz import fuzz
-from dataclasses import asdict
 
 from audible_epub3_maker.config import settings, AZURE_TTS_KEY, AZURE_TTS_REGION, in_dev
 from audible_epub3_maker.utils.types import WordBoundary, TagAlignment
+from audible_epub3_maker.utils.constants import CACHE_DIR, AZURE_VOICES_CACHE_TTL
 
 logger = logging.getLogger(__name__)
 
@@ -15,15 +16,20 @@ def is_char_based_language(lang: str) -> bool:
     return lang[:2].lower() in ["zh", "ja", "ko"]
 
 
+@functools.lru_cache(maxsize=8192)
 def normalize_text(s: str) -> str:
+    # word boundaries repeat the same few words ("the", "a", ...) over and over, so results are cached
     return "".join(s.lower().split())
 
 
 def save_wbs_as_json(word_boundaries: list[WordBoundary], output_file: Path):
     output_file = Path(output_file)
     
+    # plain dicts instead of asdict() (which deep-copies every field), 
+    # and one encoding pass + one write instead of json.dump's many small writes
+    items = [{"start_ms": wb.start_ms, "end_ms": wb.end_ms, "text": wb.text} for wb in word_boundaries]
     with output_file.open("w", encoding="utf-8") as wbs_output:
-        json.dump([asdict(wb) for wb in word_boundaries], wbs_output, ensure_ascii=False, indent=2)
+        wbs_output.write(json.dumps(items, ensure_ascii=False, indent=2))
         logger.debug(f"Wrote {len(word_boundaries)} word boundaries to {output_file}")
     pass
 
@@ -59,17 +65,19 @@ def align_sentences_and_wordboundaries(sentences: list[str],
         - Assumes sentences and word boundaries are in correct temporal/textual order.
     """
     result = [(-1, -1)] * len(sentences)
+    # the dump lines (one per scored window) are only formatted when they are saved, or logged
     dev_output = []
+    save_dev_output = bool(in_dev() and aligns_output_file)
+    log_debug = logger.isEnabledFor(logging.DEBUG)
 
     wb_texts = [normalize_text(wb.text) for wb in word_boundaries]
     wb_chars = "".join(wb_texts)
-    wb_cumulative_chars_offsets = [0]
-    for wb_text in wb_texts:
-        wb_cumulative_chars_offsets.append(wb_cumulative_chars_offsets[-1] + len(wb_text))
+    # each word's chars offset in wb_chars (and len(wb_chars) at the end), accumulated in C
+    wb_cumulative_chars_offsets = list(itertools.accumulate(map(len, wb_texts), initial=0))
     
     sent_texts = [normalize_text(sent) for sent in sentences]
-    sent_chars = "".join(sent_texts)
-    sent_cumulative_chars_offsets = [0]  # each sentence's chars offset in all sentences normalized char stream.
+    # max starting position shift in chars
+    max_start_shift = 5 if is_char_based_language(settings.tts_lang) else 10
     
     cur_wb_start_idx = 0  # current starting index in word boundaries
     unmatched_sent_chars = 0
@@ -77,10 +85,10 @@ def align_sentences_and_wordboundaries(sentences: list[str],
 
     for sent_idx, sent in enumerate(sentences):
         # logger.debug(f"Matching sentence [{sent_idx}]: {sent}")
-        dev_output.append(f"Matching sentence [{sent_idx}]: {sent}")
+        if save_dev_output:
+            dev_output.append(f"Matching sentence [{sent_idx}]: {sent}")
         target_text = sent_texts[sent_idx]
         target_text_len = len(target_text)
-        sent_cumulative_chars_offsets.append(sent_cumulative_chars_offsets[-1] + target_text_len)
         
         best_score = -1
         best_match = (0, -1)
@@ -91,29 +99,25 @@ def align_sentences_and_wordboundaries(sentences: list[str],
         max_len = max(max_len, 5)
 
         # max starting position in chars
-        max_start_shift = 5 if is_char_based_language(settings.tts_lang) else 10
         max_start_pos = wb_cumulative_chars_offsets[cur_wb_start_idx] + unmatched_sent_chars + max_start_shift
 
-        for start in range(cur_wb_start_idx, len(wb_texts)):
-            if wb_cumulative_chars_offsets[start] > max_start_pos:
-                # logger.debug(f"  Start too far ahead of last matched position ({wb_texts[cur_wb_start_idx]} -> {unmatched_sent_chars + max_start_shift}). quit sliding.")
-                dev_output.append(f"  [{sent_idx}] Start too far ahead of last matched position ({wb_texts[cur_wb_start_idx]} -> {unmatched_sent_chars + max_start_shift}). quit sliding.")
-                break  # Start too far ahead of target sentence position
-
-            buffer = ""
-            buffer_len = 0
-            for end in range(start, len(wb_texts)):
-                buffer += wb_texts[end]
-                buffer_len = len(buffer)
-
-                if buffer_len > max_len:
-                    break
-                if buffer_len < min_len:
-                    continue
-
-                score = fuzz.ratio(buffer, target_text)
+        # offsets are sorted, so the last allowed start is found by binary search instead of checking every start
+        start_stop = min(bisect.bisect_right(wb_cumulative_chars_offsets, max_start_pos, lo=cur_wb_start_idx), len(wb_texts))
+        for start in range(cur_wb_start_idx, start_stop):
+            # spans [start, end] whose length is within [min_len, max_len] are a contiguous range of `end`,
+            # so it is located by binary search and each span is sliced out of wb_chars (no char-by-char growing)
+            start_char = wb_cumulative_chars_offsets[start]
+            end_lo = bisect.bisect_left(wb_cumulative_chars_offsets, start_char + min_len, lo=start+1) - 1
+            end_hi = bisect.bisect_right(wb_cumulative_chars_offsets, start_char + max_len, lo=start+1) - 1
+            for end in range(end_lo, end_hi):
+                buffer = wb_chars[start_char: wb_cumulative_chars_offsets[end+1]]
+
+                # only a score above both the threshold and the best one so far can be used, with score_cutoff 
+                # rapidfuzz stops as soon as the score can't reach it and returns 0 (so the dev output shows 0 for those)
+                score = fuzz.ratio(buffer, target_text, score_cutoff=max(best_score, threshold))
                 # logger.debug(f"  [{sent_idx}] score:{score:.3f}, target:[{target_text}], wbs:[{buffer}]")
-                dev_output.append(f"  [{sent_idx}] score:{score:.3f}, target:[{target_text}], wbs:[{buffer}]")
+                if save_dev_output:
+                    dev_output.append(f"  [{sent_idx}] score:{score:.3f}, target:[{target_text}], wbs:[{buffer}]")
                 if score > best_score:
                     best_score = score
                     best_match = (start, end)
@@ -123,20 +127,27 @@ def align_sentences_and_wordboundaries(sentences: list[str],
             
             if best_score >= threshold:
                 break  # early exit outer loop
+        else:
+            if save_dev_output and start_stop < len(wb_texts):
+                # logger.debug(f"  Start too far ahead of last matched position ({wb_texts[cur_wb_start_idx]} -> {unmatched_sent_chars + max_start_shift}). quit sliding.")
+                dev_output.append(f"  [{sent_idx}] Start too far ahead of last matched position ({wb_texts[cur_wb_start_idx]} -> {unmatched_sent_chars + max_start_shift}). quit sliding.")
         
         if best_score >= threshold:
             if not math.isclose(best_score, 100):
                 # Left-shift refinement
-                dev_output.append(f"  [{sent_idx}] Left-shift refinement. (current best_score: {best_score:.3f})")
+                if save_dev_output:
+                    dev_output.append(f"  [{sent_idx}] Left-shift refinement. (current best_score: {best_score:.3f})")
                 start, end = best_match
+                end_char = wb_cumulative_chars_offsets[end+1]
                 for new_start in range(start+1, end+1):
-                    buffer = "".join(wb_texts[new_start: end+1])
-                    buffer_len = len(buffer)
-                    if buffer_len < len(target_text):
+                    # same length check and slicing as the window scan, no join of the word texts
+                    if end_char - wb_cumulative_chars_offsets[new_start] < target_text_len:
                         break
-                    score = fuzz.ratio(buffer, target_text)
+                    buffer = wb_chars[wb_cumulative_chars_offsets[new_start]: end_char]
+                    score = fuzz.ratio(buffer, target_text, score_cutoff=best_score)
                     # logger.debug(f"  [{sent_idx}] Left-shifted score:{score:.3f}, target:[{target_text}], wbs:[{buffer}]")
-                    dev_output.append(f"  [{sent_idx}] Left-shifted score:{score:.3f}, target:[{target_text}], wbs:[{buffer}]")
+                    if save_dev_output:
+                        dev_output.append(f"  [{sent_idx}] Left-shifted score:{score:.3f}, target:[{target_text}], wbs:[{buffer}]")
                     if score > best_score:
                         best_score = score
                         best_match = (new_start, end)
@@ -151,13 +162,16 @@ def align_sentences_and_wordboundaries(sentences: list[str],
             result[sent_idx] = (-1, -1)
             unmatched_sent_chars += target_text_len  # increase unmatched chars
             
-        match_status = "success" if result[sent_idx][1] >= 0 else "failed"
-        best_match_words = "".join(wb_texts[best_match[0]: best_match[1]+1])
-        dev_output.append(f"  Alignment {match_status} for sentence [{sent_idx}]: [{sent}]\n"
-                          f"  best_score: {best_score:.3f}, match: {best_match}, words: [{best_match_words}]")
-        logger.debug(dev_output[-1])
-
-    if in_dev() and aligns_output_file:
+        if save_dev_output or log_debug:
+            match_status = "success" if result[sent_idx][1] >= 0 else "failed"
+            best_match_words = wb_chars[wb_cumulative_chars_offsets[best_match[0]]: wb_cumulative_chars_offsets[best_match[1]+1]]
+            summary = (f"  Alignment {match_status} for sentence [{sent_idx}]: [{sent}]\n"
+                       f"  best_score: {best_score:.3f}, match: {best_match}, words: [{best_match_words}]")
+            if save_dev_output:
+                dev_output.append(summary)
+            logger.debug(summary)
+
+    if save_dev_output:
         # save alignments data in development env.
         dev_output.append(f"\n📊 Total sentences: {len(sentences)}, Matched sentences: {matched_counter}, Word boundaries: {len(word_boundaries)}")
         aligns_output_file.write_text("\n".join(dev_output))
@@ -244,15 +258,10 @@ def force_alignment(taged_sentences: list[tuple[str, str]],
 
     # save force alignment info
     if in_dev() and aligns_output_file:
-        align_map: dict[str, TagAlignment] = {align.tag_id: align for align in alignments}
-        
+        # alignments[idx] always belongs to taged_sentences[idx], no lookup by tag_id needed
         with aligns_output_file.open("w", encoding="utf-8") as f:
-            for idx, (tag_id, sentence) in enumerate(taged_sentences):
-                align = align_map.get(tag_id)
-                if align:
-                    f.write(f"sentence [{idx}]: {align} [{sentence}]\n")
-                else:
-                    f.write(f"sentenct [{idx}]: <NO ALIGN FOUND> [{sentence}]")
+            for idx, ((_, sentence), align) in enumerate(zip(taged_sentences, alignments)):
+                f.write(f"sentence [{idx}]: {align} [{sentence}]\n")
             f.write(f"\n📊 {len(sentences)} sentences, {len(alignments)} alignments, {match_counter} matched, {unmatched_counter} interpolated.")
         pass
 
@@ -267,7 +276,18 @@ def get_langs_voices_azure(subscription_key: str, region: str) -> dict[str, list
         "zh-CN": ["zh-CN-XiaoxiaoNeural", ...],
         ...
     }
+
+    The result is cached on disk per region for AZURE_VOICES_CACHE_TTL, so a run doesn't wait for the request.
     """
+    cache_file = CACHE_DIR / f"azure_voices_{region}.json"
+    try:
+        if time.time() - cache_file.stat().st_mtime < AZURE_VOICES_CACHE_TTL:
+            return json.loads(cache_file.read_text(encoding="utf-8"))
+    except FileNotFoundError:
+        pass
+    except (OSError, ValueError) as e:
+        logger.warning(f"Ignore broken Azure voices cache [{cache_file}]: {e}")
+
     url = f"https://{region}.tts.speech.microsoft.com/cognitiveservices/voices/list"
     headers = {
         "Ocp-Apim-Subscription-Key": subscription_key
@@ -288,6 +308,12 @@ def get_langs_voices_azure(subscription_key: str, region: str) -> dict[str, list
         if locale and short_name:
             langs_voices.setdefault(locale, []).append(short_name)
 
+    try:
+        cache_file.parent.mkdir(parents=True, exist_ok=True)
+        cache_file.write_text(json.dumps(langs_voices, ensure_ascii=False), encoding="utf-8")
+    except OSError as e:
+        logger.warning(f"Failed to save Azure voices cache [{cache_file}]: {e}")
+
     return langs_voices
 
 
@@ -391,11 +417,10 @@ def confirm_or_exit(msg: str):
 
 
 def format_smil_time(ms: float) -> str:
-    total_seconds = int(ms // 1000)
-    milliseconds = int(ms % 1000)
-    hours = total_seconds // 3600
-    minutes = (total_seconds % 3600) // 60
-    seconds = total_seconds % 60
+    # one float -> int conversion, then integer divmods (called twice per <par>)
+    seconds, milliseconds = divmod(int(ms), 1000)
+    minutes, seconds = divmod(seconds, 60)
+    hours, minutes = divmod(minutes, 60)
     return f"{hours}:{minutes:02}:{seconds:02}.{milliseconds:03}"
 
 
@@ -413,7 +438,8 @@ def format_seconds(seconds: float) -> str:
     return " ".join(parts)
 
 
-def generate_smil_content(smil_href: str, xhtml_href: str, audio_href: str, alignments: list[TagAlignment]) -> str:
+def generate_smil_content(smil_href: str, xhtml_href: str, audio_href: str, alignments: list[TagAlignment], 
+                          out: TextIO | None = None) -> str | None:
     """
     Generates a SMIL XML content for EPUB 3 Media Overlay.
 
@@ -422,41 +448,43 @@ def generate_smil_content(smil_href: str, xhtml_href: str, audio_href: str, alig
         xhtml_href (str): Relative path to the XHTML file (e.g., "text/ch1.xhtml").
         audio_href (str): Relative path to the MP3 file (e.g., "audio/ch1.mp3").
         alignments (list of TagAlignment): Each item links an HTML tag to an audio time span.
+        out (TextIO | None): If given, the SMIL content is written to it directly (e.g., an opened file).
 
     Returns:
-        str: A string of SMIL XML content.
+        str | None: A string of SMIL XML content, or None if it's written to `out`.
     """
-    smil_lines = [
-        '<?xml version="1.0" encoding="UTF-8"?>',
-        '<smil xmlns="http://www.w3.org/ns/SMIL" xmlns:epub="http://www.idpf.org/2007/ops" version="3.0">',
-        '  <body>',
-        '    <seq>'
-    ]
+    buffer = io.StringIO() if out is None else out
+    buffer.write(
+        '<?xml version="1.0" encoding="UTF-8"?>\n'
+        '<smil xmlns="http://www.w3.org/ns/SMIL" xmlns:epub="http://www.idpf.org/2007/ops" version="3.0">\n'
+        '  <body>\n'
+        '    <seq>\n'
+    )
+
+    # same for every <par>
+    smil_dir = Path(smil_href).parent
+    text_href = escape(os.path.relpath(xhtml_href, start=smil_dir))
+    audio_src = escape(os.path.relpath(audio_href, start=smil_dir))
 
     for idx, align in enumerate(alignments, start=1):
-        smil_dir = Path(smil_href).parent
-        xhtml_rel = os.path.relpath(xhtml_href, start=smil_dir)
-        audio_rel = os.path.relpath(audio_href, start=smil_dir)
-        
-        text_src   = f"{escape(xhtml_rel)}#{escape(align.tag_id)}"
-        audio_src  = escape(audio_rel)
+        text_src   = f"{text_href}#{escape(align.tag_id)}"
         clip_begin = format_smil_time(align.start_ms)
         clip_end   = format_smil_time(align.end_ms)
 
-        smil_lines += [
-            f'      <par id="p{idx:05d}">',
-            f'        <text src="{text_src}"/>',
-            f'        <audio src="{audio_src}" clipBegin="{clip_begin}" clipEnd="{clip_end}"/>',
-            f'      </par>'
-        ]
+        buffer.write(
+            f'      <par id="p{idx:05d}">\n'
+            f'        <text src="{text_src}"/>\n'
+            f'        <audio src="{audio_src}" clipBegin="{clip_begin}" clipEnd="{clip_end}"/>\n'
+            f'      </par>\n'
+        )
 
-    smil_lines += [
-        '    </seq>',
-        '  </body>',
+    buffer.write(
+        '    </seq>\n'
+        '  </body>\n'
         '</smil>'
-    ]
+    )
 
-    return "\n".join(smil_lines)
+    return buffer.getvalue() if out is None else None
 
 
 def format_bytes(size_bytes: int) -> str:
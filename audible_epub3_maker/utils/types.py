@@ -1,7 +1,7 @@
 from dataclasses import dataclass
 from pathlib import Path
 
-@dataclass
+@dataclass(slots=True)
 class WordBoundary:
     """
     Represents a word boundary in synthesized or aligned audio.
@@ -17,7 +17,7 @@ class WordBoundary:
     end_ms: float
     text: str
 
-@dataclass
+@dataclass(slots=True)
 class TagAlignment:
     """
     Represents a force alignment (SMIL) between HTML tags and it's audio strem.
@@ -32,7 +32,7 @@ class TagAlignment:
     end_ms: float
 
 
-@dataclass
+@dataclass(slots=True)
 class TaskPayload(object):
     idx: int
     html_text: str
@@ -48,7 +48,7 @@ class TaskPayload(object):
         )
 
 
-@dataclass
+@dataclass(slots=True)
 class TaskResult(object):
     taged_html: str
     audio_file: Path
@@ -60,7 +60,7 @@ class TaskResult(object):
             f"{self.audio_file}, {len(self.alignments)} alignments ...>"
         )
 
-@dataclass
+@dataclass(slots=True)
 class TaskErrorResult(object):
     error_type: str
     error_msg: str
@@ -1,16 +1,15 @@
 import logging, os
 import psutil
-from bs4 import BeautifulSoup
 
 from audible_epub3_maker.config import settings, in_dev
 from audible_epub3_maker.utils import helpers
 from audible_epub3_maker.utils import logging_setup
 from audible_epub3_maker.utils.types import TaskPayload, TaskResult, TaskErrorResult, NoWordBoundariesError
-from audible_epub3_maker.utils.constants import BEAUTIFULSOUP_PARSER, SEG_MARK_ATTR, SEG_TAG
 from audible_epub3_maker.tts import create_tts_engine
-from audible_epub3_maker.segmenter.html_segmenter import html_segment_and_wrap
+from audible_epub3_maker.segmenter.html_segmenter import html_segment_and_wrap, extract_marked_segments
 
 logger = logging.getLogger(__name__)
+_tts_engine = None  # created once per worker process and reused by all tasks (keeps the TTS connection/model)
 
 
 def is_parent_alive() -> bool:
@@ -40,6 +39,13 @@ def init_worker(settings_dict, log_queue):
     pass
 
 
+def get_tts_engine():
+    global _tts_engine
+    if _tts_engine is None:
+        _tts_engine = create_tts_engine(settings.tts_engine)
+    return _tts_engine
+
+
 def task_fn(payload: TaskPayload):
     """
     Worker function to be executed in a subprocess.
@@ -58,7 +64,7 @@ def task_fn(payload: TaskPayload):
         audio_output_file.with_suffix(".original_html.txt").write_text(original_html)
 
     # 1. TTS synthesis
-    tts = create_tts_engine(settings.tts_engine)
+    tts = get_tts_engine()
     wb_list = tts.html_to_speech(original_html, audio_output_file)
     logger.info(f"🔈 [Task {payload.idx}] generated audio: {audio_output_file}, Size: {helpers.format_bytes(audio_output_file.stat().st_size)}")
 
@@ -71,9 +77,7 @@ def task_fn(payload: TaskPayload):
         audio_output_file.with_suffix(".seg_html.txt").write_text(segmented_html)
     
     # 3. force alignment
-    soup = BeautifulSoup(segmented_html, BEAUTIFULSOUP_PARSER)
-    segment_elems = soup.select(f"{SEG_TAG}[{SEG_MARK_ATTR}]")
-    taged_segments = [(tag.get("id"), tag.get_text()) for tag in segment_elems]
+    taged_segments = extract_marked_segments(segmented_html)
     alignments = helpers.force_alignment(taged_segments, 
                                          wb_list, 
                                          settings.align_threshold,
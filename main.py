@@ -88,6 +88,32 @@ def parse_args():
         help="Maximum number of characters per TTS chunk (default: auto by language)"
     )
 
+    parser.add_argument(
+        "--tts_concurrency",
+        type=int,
+        default=1,
+        help="Max concurrent TTS requests (Azure) or chunk inferences (Kokoro) per chapter (default: 1)"
+    )
+
+    parser.add_argument(
+        "--tts_cache",
+        action="store_true",
+        default=False,
+        help="Cache synthesized audio on disk and reuse it for unchanged text on later runs"
+    )
+
+    parser.add_argument(
+        "--tts_dtype",
+        choices=["float32", "bfloat16", "float16"],
+        default="float32",
+        help=(
+            "Inference precision of local TTS models (Kokoro):\n"
+            "float32   - full precision\n"
+            "bfloat16  - faster on GPUs with bfloat16 support and on recent CPUs\n"
+            "float16   - faster on CUDA GPUs (bfloat16 is used on other devices)"
+        ),
+    )
+
     parser.add_argument(
         "--newline_mode",
         choices=["none", "single", "multi"],
@@ -0,0 +1,86 @@
+import pytest
+from bs4 import BeautifulSoup
+
+from audible_epub3_maker.utils.constants import BEAUTIFULSOUP_PARSER, SEG_MARK_ATTR, SEG_TAG
+from audible_epub3_maker.segmenter.html_segmenter import (
+    bs_append_suffix_to_tags,
+    extract_body_text_with_suffix,
+    extract_marked_segments,
+)
+
+
+BREAK_MAP = {"h1": "_#BRK#", "p": "_#BRK#", "li": "_#BRK#", "br": "_#BRK#"}
+
+test_data = [
+    {
+        "note": "XHTML namespace",
+        "html_input": '<html xmlns="http://www.w3.org/1999/xhtml"><head><title>T</title></head>'
+                      f'<body><h1><{SEG_TAG} id="s1" {SEG_MARK_ATTR}="1">Title</{SEG_TAG}></h1>'
+                      f'<p><{SEG_TAG} id="s2" {SEG_MARK_ATTR}="1">Hello </{SEG_TAG}><{SEG_TAG} id="s3" {SEG_MARK_ATTR}="1">world.</{SEG_TAG}></p></body></html>',
+    },
+    {
+        "note": "leading <?xml declaration and doctype",
+        "html_input": '<?xml version="1.0" encoding="UTF-8" standalone="no"?>\n'
+                      '<!DOCTYPE html>\n'
+                      '<html xmlns="http://www.w3.org/1999/xhtml" xmlns:epub="http://www.idpf.org/2007/ops">'
+                      f'<body>\n  <p><{SEG_TAG} id="s1" {SEG_MARK_ATTR}="1">First.</{SEG_TAG}></p>\n'
+                      f'  <p>Plain <{SEG_TAG} id="s2" {SEG_MARK_ATTR}="1">second.</{SEG_TAG}></p>\n</body></html>',
+    },
+    {
+        "note": "unclosed <br>",
+        "html_input": '<html xmlns="http://www.w3.org/1999/xhtml"><body>'
+                      f'<p><{SEG_TAG} id="s1" {SEG_MARK_ATTR}="1">Line one</{SEG_TAG}><br>'
+                      f'<{SEG_TAG} id="s2" {SEG_MARK_ATTR}="1">line two</{SEG_TAG}></p></body></html>',
+    },
+    {
+        "note": "character and predefined entities",
+        "html_input": '<html xmlns="http://www.w3.org/1999/xhtml"><body>'
+                      f'<p><{SEG_TAG} id="s1" {SEG_MARK_ATTR}="1">Tom &amp; Jerry &lt;3</{SEG_TAG}>'
+                      f'<{SEG_TAG} id="s2" {SEG_MARK_ATTR}="1"> caf&#233; &#x4E2D;&#x6587;</{SEG_TAG}></p></body></html>',
+    },
+    {
+        "note": "nested marked tags, in document order",
+        "html_input": '<html xmlns="http://www.w3.org/1999/xhtml"><body><ul>'
+                      f'<li><{SEG_TAG} id="s1" {SEG_MARK_ATTR}="1">Outer <{SEG_TAG} id="s2" {SEG_MARK_ATTR}="1">inner</{SEG_TAG}> tail.</{SEG_TAG}></li>'
+                      f'<li><{SEG_TAG} class="plain">Not marked.</{SEG_TAG}> <{SEG_TAG} {SEG_MARK_ATTR}="1">No id.</{SEG_TAG}></li>'
+                      '</ul></body></html>',
+    },
+    {
+        "note": "whitespace-only text between blocks and empty tags",
+        "html_input": '<html xmlns="http://www.w3.org/1999/xhtml"><body>\n\n  <p></p>\n  <p>  </p>\n'
+                      f'  <p><{SEG_TAG} id="s1" {SEG_MARK_ATTR}="1">Text</{SEG_TAG}> <b>bold</b>\n tail</p>\n</body></html>',
+    },
+    {
+        "note": "NBSP and ideographic space only strings",
+        "html_input": '<html xmlns="http://www.w3.org/1999/xhtml"><body>'
+                      f'<p>\u3000\u3000<{SEG_TAG} id="s1" {SEG_MARK_ATTR}="1">第一章</{SEG_TAG}>\u3000</p>'
+                      f'<p><b>\xa0</b> \n <i>\xa0\n</i><{SEG_TAG} id="s2" {SEG_MARK_ATTR}="1">\xa0</{SEG_TAG}>\u3000\n\u3000</p>'
+                      '</body></html>',
+    },
+    {"note": "empty input", "html_input": ""},
+    {"note": "whitespace-only input", "html_input": " \n\t "},
+    {"note": "no element", "html_input": '<?xml version="1.0" encoding="UTF-8"?>\nplain text'},
+]
+
+
+def _bs_marked_segments(html_text: str) -> list[tuple[str | None, str]]:
+    soup = BeautifulSoup(html_text, BEAUTIFULSOUP_PARSER)
+    return [(tag.get("id"), tag.get_text()) for tag in soup.select(f"{SEG_TAG}[{SEG_MARK_ATTR}]")]
+
+
+def _bs_body_text_with_suffix(html_text: str, suffix_map: dict[str, str]) -> str:
+    soup = BeautifulSoup(html_text, BEAUTIFULSOUP_PARSER)
+    bs_append_suffix_to_tags(soup, suffix_map)
+    return (soup.body or soup).get_text()
+
+
+@pytest.mark.parametrize("case", test_data, ids=[case["note"] for case in test_data])
+def test_extract_marked_segments(case):
+    html_text = case["html_input"]
+    assert extract_marked_segments(html_text) == _bs_marked_segments(html_text)
+
+
+@pytest.mark.parametrize("case", test_data, ids=[case["note"] for case in test_data])
+def test_extract_body_text_with_suffix(case):
+    html_text = case["html_input"]
+    assert extract_body_text_with_suffix(html_text, BREAK_MAP) == _bs_body_text_with_suffix(html_text, BREAK_MAP)
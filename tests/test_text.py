@@ -252,4 +252,44 @@ is_readable_test_data = [
 @pytest.mark.parametrize("text, expected", is_readable_test_data)
 def test_is_readable(text, expected):
     from audible_epub3_maker.segmenter.text_segmenter import is_readable
-    assert is_readable(text) is expected
\ No newline at end of file
+    assert is_readable(text) is expected
+
+normalize_newlines_test_data = [
+    ("line1\nline2", "multi", "line1 line2"),
+    ("para1\n\npara2", "multi", "para1\npara2"),
+    ("para1\n  \n\t\npara2\nline", "multi", "para1\npara2 line"),
+    ("a\n\nb\nc", "single", "a\n\nb\nc"),
+    ("a\n\nb\nc", "none", "a b c"),
+]
+
+@pytest.mark.parametrize("text, mode, expected", normalize_newlines_test_data)
+def test_normalize_newlines(text, mode, expected):
+    from audible_epub3_maker.segmenter.text_segmenter import normalize_newlines
+    assert normalize_newlines(text, mode) == expected
+
+pack_text_into_chunks_test_data = [
+    ("", 20),
+    ("short line", 20),
+    ("para one.\npara two.\n\npara three.\n", 20),
+    ("A long paragraph. It has several sentences, and clauses; to split at.\nNext.", 20),
+    ("A sentence without any punctuation that goes on and on well past the limit", 20),
+    ("Averyveryverylongwordwithoutanywhitespaceatallthatmustbehardcut and more", 20),
+    ("这是一个很长的中文段落，没有空格，需要在句号处分开。第二句话也很长很长很长很长很长很长很长。", 10),
+    ("Dr. Smith paid $12.50 for U.S. goods _DOT_ today, didn't he? Yes!\n\n\n   \n", 16),
+    ("word " * 200, 50),
+    ("\n\n\n", 2),
+]
+
+@pytest.mark.parametrize("text, max_chars", pack_text_into_chunks_test_data)
+def test_pack_text_into_chunks(text, max_chars):
+    from audible_epub3_maker.segmenter.text_segmenter import pack_text_into_chunks
+    chunks = pack_text_into_chunks(text, max_chars)
+    assert "".join(chunks) == text
+    assert all(0 < len(chunk) <= max_chars for chunk in chunks)
+
+
+def test_pack_text_into_chunks_keeps_paragraphs():
+    from audible_epub3_maker.segmenter.text_segmenter import pack_text_into_chunks
+    text = "para one.\npara two.\npara three is longer.\n"
+    assert pack_text_into_chunks(text, 20) == ["para one.\npara two.\n", "para three is ", "longer.\n"]
+    assert pack_text_into_chunks(text, 100) == [text]
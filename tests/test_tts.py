@@ -0,0 +1,120 @@
+import array
+import shutil
+import wave
+
+import pytest
+
+from audible_epub3_maker.tts.base_tts import AudioStreamWriter, BaseTTS
+
+
+SAMPLE_WIDTH = 2
+FRAME_RATE = 24000
+CHANNELS = 1
+
+
+def _pcm(frames: int) -> bytes:
+    return b"\x01\x02" * frames * CHANNELS
+
+
+def _writer(output_file):
+    return AudioStreamWriter(output_file, sample_width=SAMPLE_WIDTH, frame_rate=FRAME_RATE, channels=CHANNELS)
+
+
+def test_write_wav(tmp_path):
+    output_file = tmp_path / "out.wav"
+    with _writer(output_file) as writer:
+        for frames in [12000, 6000, 0, 6000]:
+            writer.write(_pcm(frames))
+        writer.write(memoryview(_pcm(24000)))
+    
+    assert writer.frames == 48000
+    assert writer.duration_ms == 2000
+
+    with wave.open(str(output_file), "rb") as f:
+        assert f.getsampwidth() == SAMPLE_WIDTH
+        assert f.getframerate() == FRAME_RATE
+        assert f.getnchannels() == CHANNELS
+        assert f.getnframes() == 48000
+        assert f.getnframes() * 1000 / f.getframerate() == writer.duration_ms
+        assert f.readframes(f.getnframes()) == _pcm(48000)
+
+
+def test_abort_removes_output(tmp_path):
+    output_file = tmp_path / "out.wav"
+    writer = _writer(output_file)
+    writer.write(_pcm(100))
+    writer.abort()
+    assert not output_file.exists()
+
+
+def test_exception_removes_output(tmp_path):
+    output_file = tmp_path / "out.wav"
+    with pytest.raises(RuntimeError):
+        with _writer(output_file) as writer:
+            writer.write(_pcm(100))
+            raise RuntimeError("tts failed")
+    assert not output_file.exists()
+
+
+def test_close_twice(tmp_path):
+    output_file = tmp_path / "out.wav"
+    writer = _writer(output_file)
+    writer.write(_pcm(100))
+    writer.close()
+    writer.close()
+    with wave.open(str(output_file), "rb") as f:
+        assert f.getnframes() == 100
+
+
+@pytest.mark.skipif(shutil.which("ffmpeg") is None, reason="ffmpeg not found")
+def test_close_twice_mp3(tmp_path):
+    output_file = tmp_path / "out.mp3"
+    with _writer(output_file) as writer:
+        writer.write(_pcm(24000))
+    writer.close()
+    assert output_file.exists()
+    assert writer.duration_ms == 1000
+
+
+def _samples(pcm) -> list[int]:
+    return array.array("h", bytes(pcm)).tolist()
+
+
+@pytest.mark.parametrize("channels", [1, 2])
+def test_fade_edges(channels):
+    frame_rate, fade_ms = 8000, 2.0
+    fade_frames = int(frame_rate * fade_ms / 1000)
+    pcm = array.array("h", [10000, -10000] * 50 * channels).tobytes()
+
+    faded = _samples(BaseTTS.fade_edges(pcm, sample_width=2, frame_rate=frame_rate, channels=channels, fade_ms=fade_ms))
+    original = _samples(pcm)
+    assert len(faded) == len(original)
+
+    fade_len = fade_frames * channels
+    # the first and last frames are silenced, the rest of the fade is attenuated
+    assert faded[:channels] == [0] * channels
+    assert faded[-channels:] == [0] * channels
+    for i in range(fade_len):
+        assert abs(faded[i]) < abs(original[i])
+        assert abs(faded[-1 - i]) < abs(original[-1 - i])
+    # the middle is untouched
+    assert faded[fade_len:-fade_len] == original[fade_len:-fade_len]
+    # the input is not modified
+    assert _samples(pcm) == original
+
+
+@pytest.mark.parametrize("frames", [0, 1, 2, 3, 15])
+def test_fade_edges_short_chunk(frames):
+    pcm = array.array("h", [10000] * frames).tobytes()
+    faded = _samples(BaseTTS.fade_edges(pcm, sample_width=2, frame_rate=24000, channels=1))
+    assert len(faded) == frames
+    assert all(abs(sample) <= 10000 for sample in faded)
+
+
+@pytest.mark.parametrize("pcm, sample_width, channels", [
+    (b"\x10\x27" * 10 + b"\x01", 2, 1),  # not whole frames
+    (b"\x10\x27" * 9, 2, 2),              # not whole stereo frames
+    (b"\x00\x10\x27" * 10, 3, 1),        # not 16bit
+])
+def test_fade_edges_unsupported(pcm, sample_width, channels):
+    assert BaseTTS.fade_edges(pcm, sample_width=sample_width, frame_rate=24000, channels=channels) == pcm
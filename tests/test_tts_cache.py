@@ -0,0 +1,57 @@
+import pytest
+
+from audible_epub3_maker.tts import tts_cache
+from audible_epub3_maker.utils.types import WordBoundary
+
+
+def test_save_and_load(tmp_path):
+    key = tts_cache.make_key("kokoro", "bfloat16", "a", "af_heart", "1.0", "Hello world.")
+    audio_data = bytes(range(256)) * 4
+    wbs = [
+        WordBoundary(0.0, 412.5, "Hello"),
+        WordBoundary(412.5, 1000.0, "world."),
+        WordBoundary(1000.0, 1200.0, "你好"),
+    ]
+
+    assert tts_cache.load(key, cache_dir=tmp_path) is None
+    tts_cache.save(key, audio_data, wbs, cache_dir=tmp_path)
+    assert tts_cache.load(key, cache_dir=tmp_path) == (audio_data, wbs)
+    # no temp files are left behind
+    assert not list(tmp_path.rglob("*.tmp"))
+
+
+def test_save_and_load_empty_word_boundaries(tmp_path):
+    key = tts_cache.make_key("empty")
+    tts_cache.save(key, b"", [], cache_dir=tmp_path)
+    assert tts_cache.load(key, cache_dir=tmp_path) == (b"", [])
+
+
+@pytest.mark.parametrize("broken_wbs", [b"", b"{not json", b'{"start_ms": [0]}', b"[1, 2, 3]"])
+def test_load_broken_entry(tmp_path, broken_wbs):
+    key = tts_cache.make_key("broken")
+    tts_cache.save(key, b"audio", [WordBoundary(0.0, 1.0, "a")], cache_dir=tmp_path)
+    wbs_file = next(tmp_path.rglob(f"{key}.wbs.cols.json"))
+    wbs_file.write_bytes(broken_wbs)
+    assert tts_cache.load(key, cache_dir=tmp_path) is None
+
+
+def test_load_missing_audio(tmp_path):
+    key = tts_cache.make_key("missing audio")
+    tts_cache.save(key, b"audio", [], cache_dir=tmp_path)
+    next(tmp_path.rglob(f"{key}.audio")).unlink()
+    assert tts_cache.load(key, cache_dir=tmp_path) is None
+
+
+def test_make_key():
+    parts = ["kokoro", "bfloat16", "a", "af_heart", "1.0", "Hello world."]
+    key = tts_cache.make_key(*parts)
+    assert key == tts_cache.make_key(*parts)
+
+    changed_parts = [
+        ["kokoro", "float32", "a", "af_heart", "1.0", "Hello world."],   # dtype
+        ["kokoro", "bfloat16", "a", "af_bella", "1.0", "Hello world."],  # voice
+        ["kokoro", "bfloat16", "a", "af_heart", "1.0", "Hello world!"],  # text
+        ["kokoro", "bfloat16", "a", "af_heart", "1.0Hello world."],       # part boundaries
+    ]
+    keys = {key} | {tts_cache.make_key(*p) for p in changed_parts}
+    assert len(keys) == len(changed_parts) + 1
@@ -109,7 +109,7 @@ def run_preview(input_file):
 
 def run_generation(input_file, output_dir, log_level, cleanup,
                    tts_engine, tts_lang, tts_voice, tts_speed,
-                   tts_chunk_len, newline_mode, align_threshold, max_workers):
+                   tts_chunk_len, newline_mode, align_threshold, max_workers, tts_concurrency):
     global aem_process
 
     if aem_process and aem_process.poll() is None:
@@ -128,6 +128,7 @@ def run_generation(input_file, output_dir, log_level, cleanup,
         "--newline_mode", newline_mode,
         "--align_threshold", str(align_threshold),
         "--max_workers", str(max_workers),
+        "--tts_concurrency", str(tts_concurrency),
         "--force"
     ]
     if cleanup:
@@ -155,7 +156,7 @@ def check_process():
  
 def on_run_click(input_file, output_dir, log_level, cleanup,
                  tts_engine, tts_lang, tts_voice, tts_speed,
-                 tts_chunk_len, newline_mode, align_threshold, max_workers):
+                 tts_chunk_len, newline_mode, align_threshold, max_workers, tts_concurrency):
     # 检查 input_file, output_dir, tts_engine 必须不为空
     if not input_file:
         raise gr.Error(f"Select a EPUB file to process")
@@ -181,7 +182,8 @@ def on_run_click(input_file, output_dir, log_level, cleanup,
             tts_chunk_len=tts_chunk_len,
             newline_mode=newline_mode,
             align_threshold=align_threshold,
-            max_workers=max_workers
+            max_workers=max_workers,
+            tts_concurrency=tts_concurrency
         )
     except Exception as e:
         raise gr.Error(f"{e}")
@@ -333,6 +335,14 @@ def launch_gui(host: str = "127.0.0.1", port: int = 7860):
                                         info="Set the max number of parallel worker processes",
                                         interactive=True
                                         )
+                with gr.Column():
+                    tts_concurrency = gr.Slider(1, 16, 
+                                        step=1, 
+                                        value=1, 
+                                        label="TTS Concurrency",
+                                        info="Set the max concurrent TTS requests (Azure) or chunk inferences (Kokoro) per worker",
+                                        interactive=True
+                                        )
 
         with gr.Row():
             run_btn = gr.Button(BTN_RUN_IDLE, variant="primary")
@@ -352,7 +362,7 @@ def launch_gui(host: str = "127.0.0.1", port: int = 7860):
             inputs=[
                 input_file, output_dir, log_level, cleanup,
                 tts_engine, tts_lang, tts_voice, tts_speed,
-                tts_chunk_len, newline_mode, align_threshold, max_workers
+                tts_chunk_len, newline_mode, align_threshold, max_workers, tts_concurrency
             ],
             outputs=None
         )